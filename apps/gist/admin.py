@@ -1 +1,10 @@
-# Register your models here.
+from django.contrib import admin
+
+from .models import SummaryResult
+
+
+@admin.register(SummaryResult)
+class SummaryResultAdmin(admin.ModelAdmin):
+    list_display = ("key", "url", "created_at")
+    search_fields = ("key", "url")
+    readonly_fields = ("key", "created_at")
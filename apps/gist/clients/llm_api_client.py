@@ -1,4 +1,6 @@
 import logging
+import os
+import threading
 
 import requests
 from django.conf import settings
@@ -6,6 +8,25 @@ from django.core.exceptions import ImproperlyConfigured
 
 logger = logging.getLogger(__name__)
 
+_session: requests.Session | None = None
+_session_pid: int | None = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session so connections to the LLM API are reused.
+
+    A new session is created after a fork, since pooled sockets must not be
+    shared between worker processes.
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            _session = requests.Session()
+            _session_pid = os.getpid()
+        return _session
+
 
 class LlmApiClient:
     """
@@ -40,7 +61,7 @@ class LlmApiClient:
             "stream": False,
         }
         try:
-            response = requests.post(
+            response = _get_session().post(
                 self.generate_endpoint,
                 json=payload,
                 timeout=(10, 120),  # (connect, read)
@@ -50,3 +71,20 @@ class LlmApiClient:
         except requests.exceptions.RequestException as e:
             logger.error(f"LLM API request failed: {e}")
             raise e
+
+    def ping(self) -> bool:
+        """
+        Checks that the LLM API is reachable.
+
+        Any HTTP response counts as success; the status code is irrelevant. The
+        connection stays in the pool, so this also warms it up for later calls.
+
+        Returns:
+            True if the API could be reached, False otherwise.
+        """
+        try:
+            _get_session().head(self.api_url, timeout=(3, 3))
+            return True
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"LLM API is not reachable: {e}")
+            return False
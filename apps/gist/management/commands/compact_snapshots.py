@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.gist.services import SnapshotStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Drops expired snapshots from the scraped text archive and recompresses "
+        "the rest with a freshly trained dictionary."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=None,
+            help="Drop snapshots older than this many days (0 keeps everything). "
+            "Defaults to SNAPSHOT_RETENTION_DAYS.",
+        )
+
+    def handle(self, *args, **options):
+        store = SnapshotStore.default()
+        if store is None:
+            raise CommandError("The snapshot archive is disabled (SNAPSHOT_ENABLED).")
+
+        retention_days = options["retention_days"]
+        if retention_days is None:
+            retention_days = settings.SNAPSHOT_RETENTION_DAYS
+        if retention_days < 0:
+            raise CommandError("--retention-days must be a non-negative integer.")
+
+        stats = store.compact(retention_seconds=retention_days * 86400)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Kept {stats.kept} snapshots, dropped {stats.dropped}; "
+                f"{stats.bytes_before} -> {stats.bytes_after} bytes "
+                f"(dictionary {stats.dict_id or 'none'})."
+            )
+        )
@@ -0,0 +1,11 @@
+from .admission import AdmissionControlMiddleware
+from .health import HealthCheckMiddleware
+from .profiling import ProfilingMiddleware
+from .rate_limit import RateLimitMiddleware
+
+__all__ = [
+    "AdmissionControlMiddleware",
+    "HealthCheckMiddleware",
+    "ProfilingMiddleware",
+    "RateLimitMiddleware",
+]
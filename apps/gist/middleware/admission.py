@@ -0,0 +1,111 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+
+logger = logging.getLogger(__name__)
+
+# 要約処理を伴わない安価なメソッドは常に受け付ける
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_OVERLOADED_MESSAGE = "サーバーが混雑しています。時間をおいて再度お試しください。"
+
+
+class AdmissionControlMiddleware:
+    """
+    Sheds summarization requests early when this worker is overloaded.
+
+    Only non-safe requests (the POSTs that trigger scraping and an LLM call) are
+    subject to admission control; GETs and static assets always pass. A request
+    is rejected with 503 and `Retry-After` when either:
+
+    - `ADMISSION_MAX_CONCURRENCY` requests are already in flight in this worker
+      process, or
+    - the queueing delay reported by nginx in `X-Request-Start` has stayed above
+      `ADMISSION_QUEUE_TARGET_MS` for at least `ADMISSION_QUEUE_INTERVAL_MS`
+      (the CoDel rule). Shedding stops as soon as a request arrives with a delay
+      below the target.
+
+    Setting both limits to 0 removes the middleware at startup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_concurrency = settings.ADMISSION_MAX_CONCURRENCY
+        self.queue_target = settings.ADMISSION_QUEUE_TARGET_MS / 1000
+        self.queue_interval = settings.ADMISSION_QUEUE_INTERVAL_MS / 1000
+        self.retry_after = settings.ADMISSION_RETRY_AFTER
+        if self.max_concurrency <= 0 and self.queue_target <= 0:
+            raise MiddlewareNotUsed
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # 遅延が目標値を超え続けた場合に遮断を開始する時刻 (CoDel の first_above_time)
+        self._first_above_time: float | None = None
+
+    def __call__(self, request):
+        if request.method in _SAFE_METHODS:
+            return self.get_response(request)
+
+        reason = self._admit(self._queue_delay(request))
+        if reason:
+            logger.warning("Shedding %s %s: %s", request.method, request.path, reason)
+            return self._overloaded_response(request)
+        try:
+            return self.get_response(request)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _admit(self, queue_delay: float | None) -> str | None:
+        """Reserves an in-flight slot, or returns the reason for rejecting."""
+        now = time.monotonic()
+        with self._lock:
+            if self.queue_target > 0 and queue_delay is not None:
+                if queue_delay < self.queue_target:
+                    self._first_above_time = None
+                elif self._first_above_time is None:
+                    self._first_above_time = now + self.queue_interval
+                elif now >= self._first_above_time:
+                    return f"queueing delay {queue_delay * 1000:.0f}ms above target"
+            if 0 < self.max_concurrency <= self._in_flight:
+                return f"{self._in_flight} requests in flight"
+            self._in_flight += 1
+            return None
+
+    @staticmethod
+    def _queue_delay(request) -> float | None:
+        """
+        Returns how long the request waited between nginx and Django, in seconds.
+
+        nginx sets `X-Request-Start: t=<epoch seconds with milliseconds>`.
+        """
+        header = request.META.get("HTTP_X_REQUEST_START", "")
+        try:
+            started = float(header.strip().removeprefix("t="))
+        except ValueError:
+            return None
+        # ミリ秒・マイクロ秒単位で送ってくるプロキシにも対応する
+        if started > 1e14:
+            started /= 1_000_000
+        elif started > 1e11:
+            started /= 1000
+        return max(0.0, time.time() - started)
+
+    def _overloaded_response(self, request) -> HttpResponse:
+        if request.path.startswith("/api/"):
+            response = JsonResponse(
+                {"error": _OVERLOADED_MESSAGE},
+                status=503,
+                json_dumps_params={"ensure_ascii": False},
+            )
+        else:
+            response = HttpResponse(
+                _OVERLOADED_MESSAGE,
+                status=503,
+                content_type="text/plain; charset=utf-8",
+            )
+        response["Retry-After"] = str(self.retry_after)
+        return response
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone
+
+from django.http import HttpResponse, JsonResponse
+
+from apps.gist.services import ReadinessService
+
+
+class HealthCheckMiddleware:
+    """
+    Answers `/health` and `/ready` before the rest of the middleware stack.
+
+    `/health` is a liveness check that does no work at all. `/ready` returns
+    the cached result of the background readiness probe (LLM API and database)
+    with 200 when everything is reachable and 503 otherwise.
+
+    Must be the first entry in MIDDLEWARE so probes skip sessions, auth, CSRF
+    and profiling.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path == "/health":
+            return self._no_store(HttpResponse("ok", content_type="text/plain"))
+        if request.path == "/ready":
+            return self._no_store(self._ready_response())
+        return self.get_response(request)
+
+    @staticmethod
+    def _ready_response() -> JsonResponse:
+        status = ReadinessService.get_status()
+        checked_at = None
+        if status.checked_at is not None:
+            checked_at = datetime.fromtimestamp(
+                status.checked_at, tz=timezone.utc
+            ).isoformat()
+        return JsonResponse(
+            {
+                "status": "ready" if status.ready else "not_ready",
+                "checks": status.checks,
+                "checked_at": checked_at,
+            },
+            status=200 if status.ready else 503,
+        )
+
+    @staticmethod
+    def _no_store(response):
+        response["Cache-Control"] = "no-store"
+        return response
@@ -0,0 +1,105 @@
+import cProfile
+import logging
+import os
+import random
+import re
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.crypto import constant_time_compare
+
+logger = logging.getLogger(__name__)
+
+_UNSAFE_PATH_CHARS_RE = re.compile(r"[^A-Za-z0-9]+")
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a sample of requests with cProfile.
+
+    A request is profiled when it wins the `PROFILING_SAMPLE_RATE` draw, or when
+    it carries the `PROFILING_TRIGGER_HEADER` header with a value equal to
+    `PROFILING_TRIGGER_TOKEN`. Profiles are written in pstats format to
+    `PROFILING_OUTPUT_DIR`, which is treated as a ring buffer holding at most
+    `PROFILING_MAX_FILES` files.
+
+    When neither sampling nor the trigger header is configured, the middleware
+    removes itself from the stack at startup, so it costs nothing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.trigger_token = settings.PROFILING_TRIGGER_TOKEN
+        if self.sample_rate <= 0 and not self.trigger_token:
+            raise MiddlewareNotUsed
+        self.trigger_meta_key = (
+            "HTTP_" + settings.PROFILING_TRIGGER_HEADER.upper().replace("-", "_")
+        )
+        self.output_dir = Path(settings.PROFILING_OUTPUT_DIR)
+        self.max_files = settings.PROFILING_MAX_FILES
+
+    def __call__(self, request):
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 別のプロファイラが既に有効なスレッドではプロファイルを諦める
+            logger.warning("Profiler is already active; skipping request profiling.")
+            return self.get_response(request)
+        try:
+            return self.get_response(request)
+        finally:
+            profiler.disable()
+            try:
+                self._save(profiler, request)
+            except OSError:
+                logger.exception("Failed to write request profile.")
+
+    def _should_profile(self, request) -> bool:
+        if self.trigger_token:
+            value = request.META.get(self.trigger_meta_key)
+            if value and constant_time_compare(value, self.trigger_token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def _save(self, profiler: cProfile.Profile, request) -> None:
+        """Writes the profile atomically, then drops the oldest files over the limit."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        path_slug = _UNSAFE_PATH_CHARS_RE.sub("_", request.path).strip("_") or "root"
+        filename = "{}-{}-{}-{}-{}.prof".format(
+            time.strftime("%Y%m%dT%H%M%S"),
+            os.getpid(),
+            uuid.uuid4().hex[:8],
+            request.method,
+            path_slug[:64],
+        )
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        os.close(fd)
+        try:
+            profiler.dump_stats(tmp_path)
+            os.replace(tmp_path, self.output_dir / filename)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        logger.info("Wrote request profile %s", filename)
+        self._prune()
+
+    def _prune(self) -> None:
+        profiles = []
+        for path in self.output_dir.glob("*.prof"):
+            try:
+                profiles.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                # 他のワーカーが同時に削除した
+                continue
+        profiles.sort()
+        for _, path in profiles[: max(0, len(profiles) - self.max_files)]:
+            path.unlink(missing_ok=True)
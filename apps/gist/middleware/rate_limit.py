@@ -0,0 +1,103 @@
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from apps.gist.services import TokenBucketRateLimiter
+
+logger = logging.getLogger(__name__)
+
+_SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_RATE_LIMITED_MESSAGE = (
+    "リクエストが多すぎます。しばらく時間をおいて再度お試しください。"
+)
+
+
+class RateLimitMiddleware:
+    """
+    Limits requests per client with token buckets shared across workers.
+
+    Safe methods draw from the "read" bucket; other methods (which trigger
+    scraping and an LLM call) draw from the much smaller "llm" bucket. Clients
+    are identified by an API key from `RATE_LIMIT_API_KEYS` sent in the
+    `X-API-Key` header, otherwise by their IP address. Limited requests get
+    429 with `Retry-After`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if not settings.RATE_LIMIT_ENABLED:
+            raise MiddlewareNotUsed
+        cache = caches[settings.RATE_LIMIT_CACHE_ALIAS]
+        self.read_limiter = TokenBucketRateLimiter(
+            cache,
+            "read",
+            per_minute=settings.RATE_LIMIT_READ_PER_MINUTE,
+            burst=settings.RATE_LIMIT_READ_BURST,
+        )
+        self.llm_limiter = TokenBucketRateLimiter(
+            cache,
+            "llm",
+            per_minute=settings.RATE_LIMIT_LLM_PER_MINUTE,
+            burst=settings.RATE_LIMIT_LLM_BURST,
+        )
+        self.api_keys = settings.RATE_LIMIT_API_KEYS
+        ip_header = settings.RATE_LIMIT_CLIENT_IP_HEADER
+        self.ip_meta_key = (
+            "HTTP_" + ip_header.upper().replace("-", "_") if ip_header else None
+        )
+
+    def __call__(self, request):
+        if request.path.startswith(settings.STATIC_URL):
+            return self.get_response(request)
+
+        limiter = (
+            self.read_limiter if request.method in _SAFE_METHODS else self.llm_limiter
+        )
+        client_id = self._client_id(request)
+        retry_after = limiter.consume(client_id)
+        if retry_after > 0:
+            logger.warning(
+                "Rate limited %s bucket for %s on %s %s",
+                limiter.name,
+                client_id if client_id.startswith("ip:") else "api key",
+                request.method,
+                request.path,
+            )
+            return self._rate_limited_response(request, retry_after)
+        return self.get_response(request)
+
+    def _client_id(self, request) -> str:
+        api_key = request.META.get("HTTP_X_API_KEY")
+        if api_key:
+            for known_key in self.api_keys:
+                if constant_time_compare(api_key, known_key):
+                    return f"key:{known_key}"
+        ip = None
+        if self.ip_meta_key:
+            # nginx が上書きするヘッダのみを信頼する (クライアントが偽装できない)
+            ip = request.META.get(self.ip_meta_key, "").split(",")[0].strip()
+        return f"ip:{ip or request.META.get('REMOTE_ADDR', '')}"
+
+    @staticmethod
+    def _rate_limited_response(request, retry_after: float) -> HttpResponse:
+        if request.path.startswith("/api/"):
+            response = JsonResponse(
+                {"error": _RATE_LIMITED_MESSAGE},
+                status=429,
+                json_dumps_params={"ensure_ascii": False},
+            )
+        else:
+            response = HttpResponse(
+                _RATE_LIMITED_MESSAGE,
+                status=429,
+                content_type="text/plain; charset=utf-8",
+            )
+        if math.isfinite(retry_after):
+            response["Retry-After"] = str(max(1, math.ceil(retry_after)))
+        return response
@@ -1 +1,19 @@
-# Create your models here.
+from django.db import models
+
+
+class SummaryResult(models.Model):
+    """A stored summarization result, addressed by a hash of its content."""
+
+    key = models.CharField(max_length=32, unique=True)
+    url = models.URLField(max_length=2048)
+    summary = models.TextField()
+    scraped_content = models.TextField(blank=True)
+    # スナップショットアーカイブに保存した本文のキー (DB に本文を持たない場合)
+    content_hash = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.key} ({self.url})"
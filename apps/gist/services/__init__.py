@@ -1,11 +1,32 @@
+from .model_router import ModelRouter, RoutingDecision, model_router
+from .rate_limit_service import TokenBucketRateLimiter
+from .readiness_service import ReadinessService, ReadinessStatus
+from .result_service import ResultService
 from .scraping_service import ScrapingService
+from .snapshot_store import CompactionStats, SnapshotStore
 from .summarization_service import (
     SummarizationService,
     SummarizationServiceError,
 )
+from .summary_cache_service import CachedSummary, SummaryCacheService
+from .worker_metrics import WorkerMetrics, WorkerState, render_prometheus
 
 __all__ = [
+    "CachedSummary",
+    "CompactionStats",
+    "ModelRouter",
+    "RoutingDecision",
+    "model_router",
+    "ReadinessService",
+    "ReadinessStatus",
+    "ResultService",
     "ScrapingService",
+    "SnapshotStore",
     "SummarizationService",
     "SummarizationServiceError",
+    "SummaryCacheService",
+    "TokenBucketRateLimiter",
+    "WorkerMetrics",
+    "WorkerState",
+    "render_prometheus",
 ]
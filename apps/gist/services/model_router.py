@@ -0,0 +1,124 @@
+import logging
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+QUALITY_TIERS = ("auto", "fast", "high")
+
+# p90 を判定に使うために必要な最小サンプル数
+_MIN_LATENCY_SAMPLES = 5
+# モデルごとに保持するサンプル数の上限
+_MAX_LATENCY_SAMPLES = 1000
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    model: str
+    reason: str
+
+
+class ModelRouter:
+    """
+    Chooses the summarization model for each request.
+
+    With `SUMMARIZATION_FAST_MODEL` configured, "auto" requests go to the fast
+    model when the input is at most `SUMMARIZATION_ROUTING_SHORT_CHARS` long, or
+    when the p90 latency of `SUMMARIZATION_MODEL` over the last
+    `SUMMARIZATION_LATENCY_WINDOW_SECONDS` exceeds `SUMMARIZATION_LATENCY_SLO_MS`.
+    Old samples expire, so traffic returns to the large model once it has had
+    no slow calls for a full window. "fast" and "high" requests pin the model.
+
+    Latency samples and decision counters are kept per process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies: dict[str, deque[tuple[float, float]]] = {}
+        self._decisions: Counter[tuple[str, str]] = Counter()
+
+    def choose(self, text_length: int, quality: str = "auto") -> RoutingDecision:
+        if quality not in QUALITY_TIERS:
+            raise ValueError(
+                f"品質の指定が不正です。{', '.join(QUALITY_TIERS)} のいずれかを指定してください。"
+            )
+        large = settings.SUMMARIZATION_MODEL
+        fast = settings.SUMMARIZATION_FAST_MODEL
+
+        if not fast or fast == large:
+            decision = RoutingDecision(large, "single_model")
+        elif quality == "high":
+            decision = RoutingDecision(large, "quality_high")
+        elif quality == "fast":
+            decision = RoutingDecision(fast, "quality_fast")
+        elif text_length <= settings.SUMMARIZATION_ROUTING_SHORT_CHARS:
+            decision = RoutingDecision(fast, "short_input")
+        elif self._breaches_slo(large):
+            decision = RoutingDecision(fast, "slo_breach")
+        else:
+            decision = RoutingDecision(large, "default")
+
+        with self._lock:
+            self._decisions[(decision.model, decision.reason)] += 1
+        logger.debug(
+            "Routed summarization to %s (reason=%s, chars=%d, quality=%s)",
+            decision.model,
+            decision.reason,
+            text_length,
+            quality,
+        )
+        return decision
+
+    def record_latency(self, model: str, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            samples = self._latencies.setdefault(
+                model, deque(maxlen=_MAX_LATENCY_SAMPLES)
+            )
+            samples.append((now, seconds))
+            self._expire(samples, now)
+
+    def latency_p90(self, model: str) -> float | None:
+        """Returns the p90 latency in seconds, or None with too few recent samples."""
+        with self._lock:
+            samples = self._latencies.get(model)
+            if not samples:
+                return None
+            self._expire(samples, time.monotonic())
+            latencies = sorted(latency for _, latency in samples)
+        if len(latencies) < _MIN_LATENCY_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+
+    def decision_counts(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            return dict(self._decisions)
+
+    def export_state(self) -> dict:
+        """Returns the decision counters and latency p90s as JSON-serializable data."""
+        with self._lock:
+            models = sorted(self._latencies)
+        return {
+            "decisions": [
+                [model, reason, count]
+                for (model, reason), count in sorted(self.decision_counts().items())
+            ],
+            "latency_p90": {model: self.latency_p90(model) for model in models},
+        }
+
+    def _breaches_slo(self, model: str) -> bool:
+        p90 = self.latency_p90(model)
+        return p90 is not None and p90 * 1000 > settings.SUMMARIZATION_LATENCY_SLO_MS
+
+    @staticmethod
+    def _expire(samples: deque[tuple[float, float]], now: float) -> None:
+        cutoff = now - settings.SUMMARIZATION_LATENCY_WINDOW_SECONDS
+        while samples and samples[0][0] < cutoff:
+            samples.popleft()
+
+
+model_router = ModelRouter()
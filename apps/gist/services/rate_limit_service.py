@@ -0,0 +1,96 @@
+import hashlib
+import math
+import time
+
+from django.core.cache import BaseCache
+from django.core.cache.backends.redis import RedisCache
+
+# 補充・消費・保存を 1 回の往復で原子的に行う。Lua の数値は整数に丸めて返される
+# ため、残りトークン数は文字列で返す
+_REDIS_CONSUME_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated_at")
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated_at", tostring(now))
+if ttl > 0 then
+    redis.call("EXPIRE", KEYS[1], ttl)
+end
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucketRateLimiter:
+    """
+    A token bucket per client, stored in a Django cache shared by all workers.
+
+    Each client starts with `burst` tokens; tokens refill continuously at
+    `per_minute` per minute up to `burst`, and every request takes one.
+
+    With a Redis cache, each update runs as a single Lua script, so concurrent
+    requests from different workers never share a token. Other caches (used in
+    tests) fall back to a non-atomic get and set.
+    """
+
+    def __init__(self, cache: BaseCache, name: str, per_minute: float, burst: int):
+        self.cache = cache
+        self.name = name
+        self.rate = per_minute / 60
+        self.burst = burst
+        # 空の状態から満タンまで回復したら状態を保持する必要はない
+        self.ttl = math.ceil(burst / self.rate) + 1 if self.rate > 0 else None
+        self._redis_script = None
+
+    def consume(self, client_id: str) -> float:
+        """
+        Takes one token from the client's bucket.
+
+        Returns:
+            0 if the request is allowed, otherwise the number of seconds until
+            a token becomes available.
+        """
+        key = self._cache_key(client_id)
+        now = time.time()
+        if isinstance(self.cache, RedisCache):
+            return self._consume_redis(key, now)
+
+        tokens, updated_at = self.cache.get(key, (self.burst, now))
+        tokens = min(self.burst, tokens + max(0.0, now - updated_at) * self.rate)
+
+        if tokens < 1:
+            self.cache.set(key, (tokens, now), self.ttl)
+            if self.rate <= 0:
+                return math.inf
+            return (1 - tokens) / self.rate
+
+        self.cache.set(key, (tokens - 1, now), self.ttl)
+        return 0.0
+
+    def _consume_redis(self, key: str, now: float) -> float:
+        key = self.cache.make_and_validate_key(key)
+        client = self.cache._cache.get_client(key, write=True)
+        if self._redis_script is None:
+            # EVALSHA で送るため、スクリプト本体は初回 (またはサーバー再起動後) のみ送信される
+            self._redis_script = client.register_script(_REDIS_CONSUME_SCRIPT)
+        allowed, tokens = self._redis_script(
+            keys=[key], args=[self.rate, self.burst, now, self.ttl or 0], client=client
+        )
+        if allowed:
+            return 0.0
+        if self.rate <= 0:
+            return math.inf
+        return (1 - float(tokens)) / self.rate
+
+    def _cache_key(self, client_id: str) -> str:
+        # 任意長の識別子 (API キーなど) をそのままキャッシュキーにしない
+        digest = hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:32]
+        return f"ratelimit:{self.name}:{digest}"
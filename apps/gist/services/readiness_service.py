@@ -0,0 +1,102 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, connections
+
+from apps.gist.clients.llm_api_client import LlmApiClient
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ReadinessStatus:
+    """The result of the most recent readiness probe."""
+
+    checks: dict[str, bool] = field(default_factory=dict)
+    checked_at: float | None = None
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.checks) and all(self.checks.values())
+
+
+class ReadinessService:
+    """
+    Reports whether the LLM API and the database are usable.
+
+    Probes run in a background thread every `READINESS_REFRESH_SECONDS`, so
+    callers only ever read the cached status and never wait on the network.
+    `start` runs the first probe synchronously and then starts the thread; the
+    Gunicorn config calls it when each worker boots, and `get_status` calls it
+    on first use otherwise.
+    """
+
+    _status = ReadinessStatus()
+    _lock = threading.Lock()
+    _thread_pid: int | None = None
+
+    @classmethod
+    def get_status(cls) -> ReadinessStatus:
+        cls.start()
+        return cls._status
+
+    @classmethod
+    def start(cls) -> ReadinessStatus:
+        """Probes once and starts the background refresher in this process."""
+        # fork 後の子プロセスにはスレッドが引き継がれないため pid で判定する
+        with cls._lock:
+            if cls._thread_pid != os.getpid():
+                cls._thread_pid = os.getpid()
+                # 起動直後の /ready が 503 にならないよう、最初の 1 回はその場で確認する
+                cls._refresh_safely()
+                threading.Thread(
+                    target=cls._refresh_forever, name="readiness-probe", daemon=True
+                ).start()
+        return cls._status
+
+    @classmethod
+    def refresh(cls) -> ReadinessStatus:
+        """Runs all probes synchronously and caches the result."""
+        cls._status = ReadinessStatus(
+            checks={"llm": cls._check_llm(), "database": cls._check_database()},
+            checked_at=time.time(),
+        )
+        return cls._status
+
+    @classmethod
+    def _refresh_forever(cls) -> None:
+        while True:
+            time.sleep(settings.READINESS_REFRESH_SECONDS)
+            cls._refresh_safely()
+
+    @classmethod
+    def _refresh_safely(cls) -> None:
+        try:
+            cls.refresh()
+        except Exception:
+            logger.exception("Readiness probe failed unexpectedly.")
+
+    @staticmethod
+    def _check_llm() -> bool:
+        try:
+            return LlmApiClient().ping()
+        except ImproperlyConfigured:
+            return False
+
+    @staticmethod
+    def _check_database() -> bool:
+        try:
+            with connections["default"].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except DatabaseError as e:
+            logger.warning(f"Database is not reachable: {e}")
+            return False
+        finally:
+            # このスレッド専用の接続を残さない
+            connections["default"].close()
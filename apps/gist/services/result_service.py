@@ -0,0 +1,70 @@
+import hashlib
+
+from apps.gist.models import SummaryResult
+
+from .snapshot_store import SnapshotStore
+
+
+class ResultService:
+    """
+    Stores summarization results and looks them up by their content hash.
+
+    A result's key is derived from its URL, scraped text and summary, so the same
+    result always gets the same permalink and a stored result never changes.
+    With the snapshot archive enabled, the scraped text is kept there instead of
+    in the database and is filled back in by `get`.
+    """
+
+    KEY_LENGTH = 32
+
+    @staticmethod
+    def compute_key(url: str, scraped_content: str, summary: str) -> str:
+        digest = hashlib.sha256()
+        for part in (url, scraped_content, summary):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()[: ResultService.KEY_LENGTH]
+
+    @staticmethod
+    def save(url: str, scraped_content: str, summary: str) -> SummaryResult:
+        """Stores a result, or returns the existing one with the same content."""
+        key = ResultService.compute_key(url, scraped_content, summary)
+        defaults = {
+            "url": url,
+            "scraped_content": scraped_content,
+            "summary": summary,
+        }
+        store = SnapshotStore.default()
+        if store is not None and scraped_content:
+            defaults["content_hash"] = store.put(scraped_content)
+            defaults["scraped_content"] = ""
+        result, created = SummaryResult.objects.get_or_create(
+            key=key, defaults=defaults
+        )
+        if created:
+            # 呼び出し元には DB に保存しなかった本文も含めて返す
+            result.scraped_content = scraped_content
+        else:
+            ResultService._load_content(result)
+        return result
+
+    @staticmethod
+    def exists(key: str) -> bool:
+        return SummaryResult.objects.filter(key=key).exists()
+
+    @staticmethod
+    def get(key: str) -> SummaryResult | None:
+        result = SummaryResult.objects.filter(key=key).first()
+        if result is not None:
+            ResultService._load_content(result)
+        return result
+
+    @staticmethod
+    def _load_content(result: SummaryResult) -> None:
+        """Fills in scraped text kept in the snapshot archive."""
+        if result.scraped_content or not result.content_hash:
+            return
+        store = SnapshotStore.default()
+        if store is not None:
+            # 保持期間を過ぎて compact で削除された本文は空のまま返す
+            result.scraped_content = store.get(result.content_hash) or ""
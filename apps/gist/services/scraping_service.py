@@ -1,9 +1,50 @@
+import codecs
+import io
 import ipaddress
+import logging
+import re
 import socket
 from urllib.parse import urlparse
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, UnicodeDammit
+from django.conf import settings
+from pypdf import PdfReader
+
+logger = logging.getLogger(__name__)
+
+_READ_CHUNK_BYTES = 64 * 1024
+# HTML パーサーを通さずにそのまま使うテキスト形式
+_PLAIN_TEXT_TYPES = ("text/plain", "text/markdown", "text/x-markdown")
+# 1 文字あたり最大 4 バイト (UTF-8) とし、空白の正規化で減る分も見込んで多めに読む
+_PLAIN_TEXT_BYTES_PER_CHAR = 8
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# <meta charset> を探す範囲 (HTML 仕様の 1024 バイトより少し広めに取る)
+_META_SCAN_BYTES = 4096
+_CONTENT_TYPE_CHARSET_RE = re.compile(r"charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]*?charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16-le"),
+    (codecs.BOM_UTF16_BE, "utf-16-be"),
+)
+# ブラウザ (WHATWG Encoding Standard) と同じく、ラベルを実際に使われる上位互換の
+# コーデックに読み替える
+_CHARSET_ALIASES = {
+    "shift_jis": "cp932",
+    "shift-jis": "cp932",
+    "sjis": "cp932",
+    "x-sjis": "cp932",
+    "ms_kanji": "cp932",
+    "windows-31j": "cp932",
+    "euc-jp": "euc_jis_2004",
+    "x-euc-jp": "euc_jis_2004",
+    "iso-8859-1": "cp1252",
+    "latin1": "cp1252",
+    "us-ascii": "cp1252",
+    "ascii": "cp1252",
+}
 
 
 class ScrapingService:
@@ -40,28 +81,200 @@ class ScrapingService:
         return False
 
     @staticmethod
-    def scrape(url: str, timeout=(10, 30)) -> str:
+    def scrape(url: str, timeout=(10, 30), max_chars: int | None = None) -> str:
+        """
+        Fetches a URL and extracts its text.
+
+        HTML is cleaned with BeautifulSoup, plain text and markdown are used as
+        is, and PDFs are read page by page. Other content types yield an empty
+        string.
+
+        Args:
+            max_chars: For plain text and PDFs, stop extracting once this many
+                       characters have been collected. Callers that only
+                       summarize the text can pass settings.SUMMARY_MAX_CHARS,
+                       since the rest would be truncated anyway. Defaults to the
+                       whole document (within SCRAPE_MAX_BYTES and PDF_MAX_PAGES).
+        """
         ScrapingService.validate_url(url)
 
+        limit = settings.SCRAPE_MAX_BYTES
+
         headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         try:
             response = requests.get(
-                url, headers=headers, timeout=timeout, allow_redirects=False
+                url,
+                headers=headers,
+                timeout=timeout,
+                allow_redirects=False,
+                stream=True,
             )
-            response.raise_for_status()
         except requests.RequestException as e:
             raise ValueError(f"コンテンツ取得に失敗しました: {e}") from e
 
-        # 明らかに非 HTML のレスポンスは早期リターン
-        ctype = (response.headers.get("Content-Type") or "").lower()
-        if not ("html" in ctype or ctype.startswith("text/")):
-            return ""
+        try:
+            try:
+                response.raise_for_status()
+            except requests.RequestException as e:
+                raise ValueError(f"コンテンツ取得に失敗しました: {e}") from e
 
-        soup = BeautifulSoup(response.content, "html.parser")
+            ctype = (response.headers.get("Content-Type") or "").lower()
+            mime = ctype.split(";")[0].strip()
+            if mime == "application/pdf":
+                content, truncated = ScrapingService._read_body(response, limit)
+                # PDF は末尾の xref が無いと読めないため、途中までの本文は使わない
+                if truncated:
+                    raise ValueError("PDF のサイズが大きすぎるため要約できません。")
+                return ScrapingService._extract_pdf(content, max_chars)
+            if mime in _PLAIN_TEXT_TYPES:
+                if max_chars is not None:
+                    # 空白の正規化で文字数が減るため、予算の数倍だけ読めば足りる
+                    limit = min(limit, max(max_chars, 1) * _PLAIN_TEXT_BYTES_PER_CHAR)
+                content, truncated = ScrapingService._read_body(response, limit)
+                return ScrapingService._extract_plain_text(
+                    content, ctype, max_chars, truncated
+                )
+            # 明らかに非 HTML のレスポンスは本文を読まずに早期リターン
+            if not ("html" in ctype or ctype.startswith("text/")):
+                return ""
+            content, _ = ScrapingService._read_body(response, limit)
+        finally:
+            response.close()
+
+        html = ScrapingService._decode_content(content, ctype)
+        soup = BeautifulSoup(html, "html.parser")
         for element in soup(["script", "style", "header", "footer", "nav", "aside"]):
             element.decompose()
         if soup.body:
             return soup.body.get_text(separator=" ", strip=True)
         return ""
+
+    @staticmethod
+    def _read_body(response, limit: int) -> tuple[bytes, bool]:
+        """
+        Reads a streamed response body up to `limit` bytes.
+
+        Returns:
+            The body and whether it was cut off at the limit.
+        """
+        buffer = bytearray()
+        try:
+            chunk_size = min(_READ_CHUNK_BYTES, limit + 1)
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                buffer += chunk
+                if len(buffer) > limit:
+                    return bytes(buffer[:limit]), True
+        except requests.RequestException as e:
+            raise ValueError(f"コンテンツ取得に失敗しました: {e}") from e
+        return bytes(buffer), False
+
+    @staticmethod
+    def _extract_plain_text(
+        content: bytes,
+        content_type: str,
+        max_chars: int | None = None,
+        truncated: bool = False,
+    ) -> str:
+        """Decodes plain text or markdown without HTML parsing."""
+        if truncated:
+            # 途中で切れた文字があると UTF-8 の判定に失敗して推測処理に回ってしまう
+            content = ScrapingService._trim_partial_utf8(content)
+        text = ScrapingService._decode_content(content, content_type)
+        return _WHITESPACE_RE.sub(" ", text).strip()[:max_chars]
+
+    @staticmethod
+    def _trim_partial_utf8(content: bytes) -> bytes:
+        """Drops a UTF-8 sequence that was cut off at the end of `content`."""
+        for i in range(1, min(4, len(content)) + 1):
+            byte = content[-i]
+            if byte & 0xC0 == 0x80:
+                # 継続バイトなので先頭バイトまで遡る
+                continue
+            if byte >= 0xF0:
+                length = 4
+            elif byte >= 0xE0:
+                length = 3
+            elif byte >= 0xC0:
+                length = 2
+            else:
+                length = 1
+            return content[:-i] if length > i else content
+        return content
+
+    @staticmethod
+    def _extract_pdf(content: bytes, max_chars: int | None = None) -> str:
+        """
+        Extracts the text of a PDF page by page.
+
+        Stops after `PDF_MAX_PAGES` pages or once `max_chars` characters (if
+        given) have been collected. Returns an empty string if the document cannot be parsed.
+        """
+        parts: list[str] = []
+        collected = 0
+        try:
+            reader = PdfReader(io.BytesIO(content))
+            for index, page in enumerate(reader.pages):
+                if index >= settings.PDF_MAX_PAGES or (
+                    max_chars is not None and collected >= max_chars
+                ):
+                    break
+                text = _WHITESPACE_RE.sub(" ", page.extract_text() or "").strip()
+                if text:
+                    parts.append(text)
+                    collected += len(text) + 1
+        except Exception:
+            logger.warning("Failed to extract text from PDF.", exc_info=True)
+            return ""
+        return " ".join(parts)[:max_chars]
+
+    @staticmethod
+    def _decode_content(content: bytes, content_type: str) -> str:
+        """
+        Decodes a response body without BeautifulSoup's encoding sniffing.
+
+        The charset is taken from the Content-Type header, then a BOM, then a
+        <meta charset> declaration near the start of the document. Only if none
+        of these is usable are heuristics applied: strict UTF-8 first, then
+        UnicodeDammit as the last resort.
+        """
+        header_match = _CONTENT_TYPE_CHARSET_RE.search(content_type)
+        if header_match:
+            codec = ScrapingService._lookup_codec(header_match.group(1))
+            if codec:
+                if codec == "utf-8":
+                    codec = "utf-8-sig"
+                return content.decode(codec, errors="replace")
+
+        for bom, codec in _BOMS:
+            if content.startswith(bom):
+                return content.decode(codec, errors="replace")
+
+        meta_match = _META_CHARSET_RE.search(content[:_META_SCAN_BYTES])
+        if meta_match:
+            codec = ScrapingService._lookup_codec(meta_match.group(1).decode("ascii"))
+            # バイト列として読めている時点で UTF-16 ではありえないため UTF-8 とみなす
+            if codec and codec.startswith("utf-16"):
+                codec = "utf-8"
+            if codec:
+                return content.decode(codec, errors="replace")
+
+        try:
+            return content.decode("utf-8")
+        except UnicodeDecodeError:
+            pass
+        dammit = UnicodeDammit(content, is_html=True)
+        if dammit.unicode_markup is not None:
+            return dammit.unicode_markup
+        return content.decode("utf-8", errors="replace")
+
+    @staticmethod
+    def _lookup_codec(label: str) -> str | None:
+        """Maps a charset label to a Python codec name, or None if unknown."""
+        label = label.strip().lower()
+        label = _CHARSET_ALIASES.get(label, label)
+        try:
+            return codecs.lookup(label).name
+        except LookupError:
+            return None
@@ -0,0 +1,555 @@
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import BinaryIO
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# digest, segment id, offset, length, dictionary id, created_at
+_INDEX_ENTRY = struct.Struct("<32sIQIId")
+_INDEX_FILE = "index"
+_LOCK_FILE = ".lock"
+_COMPACT_LOCK_FILE = ".compact.lock"
+_COMPACT_TMP_PREFIX = ".compact-"
+_SEGMENT_RE = re.compile(r"^seg-(\d{6})\.dat$")
+_DICT_RE = re.compile(r"^dict-(\d{6})\.bin$")
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+_COMPRESSION_LEVEL = 9
+# zlib が参照できるのは直前 32 KiB までのため、辞書もこれ以上大きくしても効果がない
+_DICT_SIZE = 32 * 1024
+_DICT_MIN_SAMPLES = 20
+_DICT_SHINGLE_WORDS = 4
+# 同じ内容が再び保存されたとき、保持期間の起点を更新する最短の間隔
+_TOUCH_INTERVAL_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class _IndexEntry:
+    segment_id: int
+    offset: int
+    length: int
+    dict_id: int
+    created_at: float
+
+
+@dataclass(frozen=True)
+class CompactionStats:
+    kept: int
+    dropped: int
+    bytes_before: int
+    bytes_after: int
+    dict_id: int
+
+
+class SnapshotStore:
+    """
+    An append-only, compressed archive of scraped page text.
+
+    Texts are addressed by the SHA-256 of their content. Each text is
+    zlib-compressed and appended to the active segment file, and its position
+    is appended to a fixed-width index that every process keeps in memory, so
+    lookups are a dict access plus a read from a memory-mapped segment. Small
+    pages are compressed with a shared preset dictionary trained by `compact`
+    from the pages already stored, since they are too short to compress well
+    on their own.
+
+    Appends from all processes are serialized with a file lock. `compact`
+    rewrites the live snapshots into new segments while appends continue, then
+    takes the lock briefly to atomically replace the index; other processes
+    notice the new index and reload it.
+    """
+
+    _default: "SnapshotStore | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, directory: Path | str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: dict[int, mmap.mmap] = {}
+        self._reset()
+
+    @classmethod
+    def default(cls) -> "SnapshotStore | None":
+        """Returns the store configured in settings, or None if disabled."""
+        if not settings.SNAPSHOT_ENABLED:
+            return None
+        with cls._default_lock:
+            directory = Path(settings.SNAPSHOT_DIR)
+            if cls._default is None or cls._default.directory != directory:
+                cls._default = cls(directory)
+            return cls._default
+
+    @staticmethod
+    def compute_key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text: str) -> str:
+        """
+        Stores a text unless an identical one is stored, and returns its key.
+
+        Storing an identical text again moves its retention start to now, so
+        `compact` keeps text that new results still refer to.
+        """
+        key = self.compute_key(text)
+        digest = bytes.fromhex(key)
+        with self._lock:
+            self._refresh_index()
+            entry = self._index.get(digest)
+            if entry is not None and not self._needs_touch(entry):
+                return key
+
+        data = text.encode("utf-8")
+        with self._file_lock(), self._lock:
+            # ロック待ちの間に他のプロセスが同じ内容を書き込んでいることがある
+            self._refresh_index()
+            entry = self._index.get(digest)
+            if entry is not None:
+                if self._needs_touch(entry):
+                    # 同じ位置を指すエントリを追記し、後のエントリの作成時刻を優先させる
+                    self._append_index(digest, replace(entry, created_at=time.time()))
+                return key
+            dict_id = self._current_dict_id()
+            if dict_id and len(data) > settings.SNAPSHOT_DICT_MAX_RECORD_BYTES:
+                dict_id = 0
+            payload = self._compress(data, self._load_dict(dict_id))
+            segment_id = self._active_segment_id(len(payload))
+            with open(self._segment_path(segment_id), "ab") as segment:
+                offset = segment.tell()
+                segment.write(payload)
+            entry = _IndexEntry(segment_id, offset, len(payload), dict_id, time.time())
+            self._append_index(digest, entry)
+        return key
+
+    def get(self, key: str) -> str | None:
+        """Returns the text stored under `key`, or None if it is not stored."""
+        if not _KEY_RE.match(key):
+            return None
+        digest = bytes.fromhex(key)
+        with self._lock:
+            for attempt in range(2):
+                self._refresh_index(force=attempt > 0)
+                entry = self._index.get(digest)
+                if entry is None:
+                    return None
+                try:
+                    return self._read(entry)
+                except FileNotFoundError:
+                    # 読み込み中に compact でセグメントが消えた
+                    continue
+                except zlib.error:
+                    logger.warning("Corrupt snapshot %s.", key, exc_info=True)
+                    return None
+        return None
+
+    def compact(self, retention_seconds: float = 0) -> CompactionStats:
+        """
+        Rewrites the archive without expired snapshots.
+
+        Snapshots older than `retention_seconds` (0 keeps everything) are
+        dropped, the dictionary is retrained from the remaining small pages
+        and every snapshot is recompressed into new segments. The archive is
+        rewritten from a copy of the index without holding the lock, so `put`
+        is only blocked while entries appended in the meantime are copied and
+        the index is swapped.
+        """
+        cutoff = time.time() - retention_seconds if retention_seconds > 0 else None
+        # compact 同士は直列化する
+        with FileLock(self.directory / _COMPACT_LOCK_FILE):
+            for path in self.directory.glob(f"{_COMPACT_TMP_PREFIX}*"):
+                # 中断された compact の書きかけのセグメント
+                path.unlink(missing_ok=True)
+
+            with self._file_lock(), self._lock:
+                self._refresh_index(force=True)
+                entries = dict(self._index)
+                index_pos = self._index_pos
+            old_segments = self._list(_SEGMENT_RE)
+            old_dicts = self._list(_DICT_RE)
+            bytes_before = sum(
+                self._segment_path(segment_id).stat().st_size
+                for segment_id in old_segments
+            )
+
+            with (
+                _ArchiveReader(self) as reader,
+                _SegmentWriter(self.directory) as writer,
+            ):
+                live: list[tuple[bytes, float, bytes]] = []
+                dropped = 0
+                for digest, entry in entries.items():
+                    if cutoff is not None and entry.created_at < cutoff:
+                        dropped += 1
+                        continue
+                    try:
+                        data = reader.read(entry)
+                    except (OSError, zlib.error):
+                        logger.warning(
+                            "Dropping unreadable snapshot %s.",
+                            digest.hex(),
+                            exc_info=True,
+                        )
+                        dropped += 1
+                        continue
+                    live.append((digest, entry.created_at, data))
+
+                small = [
+                    data
+                    for _, _, data in live
+                    if len(data) <= settings.SNAPSHOT_DICT_MAX_RECORD_BYTES
+                ]
+                zdict = train_dictionary(small)
+                dict_id = 0
+                if zdict:
+                    dict_id = max(old_dicts, default=0) + 1
+                    self._write_atomic(self._dict_path(dict_id), zdict)
+
+                # セグメント番号は index を置き換えるときに確定する
+                new_entries: dict[bytes, _IndexEntry] = {}
+                for digest, created_at, data in sorted(live, key=lambda r: r[1]):
+                    new_entries[digest] = writer.write(data, zdict, dict_id, created_at)
+                del live
+
+                with self._file_lock(), self._lock:
+                    # 書き直しの間に put で追記されたエントリを新しいセグメントに写す
+                    with open(self.directory / _INDEX_FILE, "rb") as index:
+                        index.seek(index_pos)
+                        appended = index.read()
+                    usable = len(appended) - len(appended) % _INDEX_ENTRY.size
+                    for fields in _INDEX_ENTRY.iter_unpack(appended[:usable]):
+                        digest, entry = fields[0], _IndexEntry(*fields[1:])
+                        current = new_entries.get(digest)
+                        if current is not None:
+                            new_entries[digest] = replace(
+                                current,
+                                created_at=max(current.created_at, entry.created_at),
+                            )
+                            continue
+                        new_entries[digest] = writer.write(
+                            reader.read(entry), zdict, dict_id, entry.created_at
+                        )
+                    writer.close()
+
+                    replaced_segments = self._list(_SEGMENT_RE)
+                    base = max(replaced_segments, default=0) + 1
+                    for local_id, path in enumerate(writer.paths):
+                        os.replace(path, self._segment_path(base + local_id))
+                    index = bytearray()
+                    for digest, entry in new_entries.items():
+                        entry = replace(entry, segment_id=base + entry.segment_id)
+                        index += self._pack(digest, entry)
+
+                    # 新しい index に置き換えた後は古いセグメントと辞書を参照しない
+                    self._write_atomic(self.directory / _INDEX_FILE, bytes(index))
+                    for old_id in replaced_segments:
+                        self._segment_path(old_id).unlink(missing_ok=True)
+                    for old_id in self._list(_DICT_RE):
+                        if old_id != dict_id:
+                            self._dict_path(old_id).unlink(missing_ok=True)
+                    self._reset()
+
+        return CompactionStats(
+            len(new_entries), dropped, bytes_before, writer.bytes_written, dict_id
+        )
+
+    @staticmethod
+    def _needs_touch(entry: _IndexEntry) -> bool:
+        return time.time() - entry.created_at >= _TOUCH_INTERVAL_SECONDS
+
+    def _append_index(self, digest: bytes, entry: _IndexEntry) -> None:
+        index_path = self.directory / _INDEX_FILE
+        if index_path.exists() and index_path.stat().st_size > self._index_pos:
+            # 書き込み中にクラッシュした不完全なエントリを取り除く
+            os.truncate(index_path, self._index_pos)
+        with open(index_path, "ab") as index:
+            index.write(self._pack(digest, entry))
+            self._index_pos = index.tell()
+        self._index[digest] = entry
+
+    def _reset(self) -> None:
+        for segment in self._maps.values():
+            segment.close()
+        self._index: dict[bytes, _IndexEntry] = {}
+        self._index_pos = 0
+        self._index_inode: int | None = None
+        self._maps: dict[int, mmap.mmap] = {}
+        self._dicts: dict[int, bytes] = {}
+
+    def _refresh_index(self, force: bool = False) -> None:
+        """Reads index entries appended since the last call (by any process)."""
+        path = self.directory / _INDEX_FILE
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._reset()
+            return
+        if force or stat.st_ino != self._index_inode:
+            # compact で index が置き換えられた
+            self._reset()
+            self._index_inode = stat.st_ino
+        if stat.st_size - self._index_pos < _INDEX_ENTRY.size:
+            return
+        with open(path, "rb") as index:
+            index.seek(self._index_pos)
+            data = index.read()
+        # 書き込み途中の末尾のエントリは次回読み込む
+        usable = len(data) - len(data) % _INDEX_ENTRY.size
+        for fields in _INDEX_ENTRY.iter_unpack(data[:usable]):
+            self._index[fields[0]] = _IndexEntry(*fields[1:])
+        self._index_pos += usable
+
+    def _read(self, entry: _IndexEntry) -> str:
+        return self._read_bytes(entry).decode("utf-8")
+
+    def _read_bytes(self, entry: _IndexEntry) -> bytes:
+        end = entry.offset + entry.length
+        segment = self._maps.get(entry.segment_id)
+        if segment is None or len(segment) < end:
+            # 書き込み中のセグメントは伸びるため、必要になったら map し直す
+            with open(self._segment_path(entry.segment_id), "rb") as f:
+                segment = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            old = self._maps.pop(entry.segment_id, None)
+            if old is not None:
+                old.close()
+            self._maps[entry.segment_id] = segment
+        return self._decompress(
+            segment[entry.offset : end], self._load_dict(entry.dict_id)
+        )
+
+    @staticmethod
+    def _decompress(payload: bytes, zdict: bytes | None) -> bytes:
+        if zdict:
+            decompressor = zlib.decompressobj(zdict=zdict)
+        else:
+            decompressor = zlib.decompressobj()
+        return decompressor.decompress(payload) + decompressor.flush()
+
+    @staticmethod
+    def _compress(data: bytes, zdict: bytes | None) -> bytes:
+        if zdict:
+            compressor = zlib.compressobj(_COMPRESSION_LEVEL, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(_COMPRESSION_LEVEL)
+        return compressor.compress(data) + compressor.flush()
+
+    def _load_dict(self, dict_id: int) -> bytes | None:
+        if not dict_id:
+            return None
+        if dict_id not in self._dicts:
+            self._dicts[dict_id] = self._dict_path(dict_id).read_bytes()
+        return self._dicts[dict_id]
+
+    def _current_dict_id(self) -> int:
+        return max(self._list(_DICT_RE), default=0)
+
+    def _active_segment_id(self, size: int) -> int:
+        """Returns the segment to append `size` bytes to, starting a new one if full."""
+        segment_id = max(self._list(_SEGMENT_RE), default=0)
+        if segment_id == 0:
+            return 1
+        current = self._segment_path(segment_id).stat().st_size
+        if current and current + size > settings.SNAPSHOT_SEGMENT_MAX_BYTES:
+            return segment_id + 1
+        return segment_id
+
+    def _list(self, pattern: re.Pattern) -> list[int]:
+        ids = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                ids.append(int(match.group(1)))
+        return ids
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.directory / f"seg-{segment_id:06d}.dat"
+
+    def _dict_path(self, dict_id: int) -> Path:
+        return self.directory / f"dict-{dict_id:06d}.bin"
+
+    @staticmethod
+    def _pack(digest: bytes, entry: _IndexEntry) -> bytes:
+        return _INDEX_ENTRY.pack(
+            digest,
+            entry.segment_id,
+            entry.offset,
+            entry.length,
+            entry.dict_id,
+            entry.created_at,
+        )
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _file_lock(self):
+        return FileLock(self.directory / _LOCK_FILE)
+
+
+class _ArchiveReader:
+    """
+    Reads snapshots for `compact` without the store's in-memory caches, which
+    requests keep using while the archive is rewritten.
+    """
+
+    def __init__(self, store: SnapshotStore):
+        self._store = store
+        self._files: dict[int, BinaryIO] = {}
+        self._dicts: dict[int, bytes | None] = {0: None}
+
+    def read(self, entry: _IndexEntry) -> bytes:
+        segment = self._files.get(entry.segment_id)
+        if segment is None:
+            segment = open(self._store._segment_path(entry.segment_id), "rb")
+            self._files[entry.segment_id] = segment
+        segment.seek(entry.offset)
+        payload = segment.read(entry.length)
+        if entry.dict_id not in self._dicts:
+            self._dicts[entry.dict_id] = self._store._dict_path(
+                entry.dict_id
+            ).read_bytes()
+        return SnapshotStore._decompress(payload, self._dicts[entry.dict_id])
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        for segment in self._files.values():
+            segment.close()
+        self._files.clear()
+
+
+class _SegmentWriter:
+    """
+    Writes recompressed snapshots for `compact` to temporary segment files.
+
+    Entries carry the position of their file in `paths` as the segment id
+    until the files are renamed into place.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.paths: list[Path] = []
+        self.bytes_written = 0
+        self._file: BinaryIO | None = None
+
+    def write(
+        self, data: bytes, zdict: bytes, dict_id: int, created_at: float
+    ) -> _IndexEntry:
+        if dict_id and len(data) > settings.SNAPSHOT_DICT_MAX_RECORD_BYTES:
+            dict_id = 0
+        payload = SnapshotStore._compress(data, zdict if dict_id else None)
+        if self._file is None or (
+            self._file.tell()
+            and self._file.tell() + len(payload) > settings.SNAPSHOT_SEGMENT_MAX_BYTES
+        ):
+            self.close()
+            path = self.directory / f"{_COMPACT_TMP_PREFIX}{len(self.paths):06d}.tmp"
+            self.paths.append(path)
+            self._file = open(path, "wb")
+        offset = self._file.tell()
+        self._file.write(payload)
+        return _IndexEntry(
+            len(self.paths) - 1, offset, len(payload), dict_id, created_at
+        )
+
+    def close(self) -> None:
+        if self._file is not None:
+            self.bytes_written += self._file.tell()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FileLock:
+    """An exclusive flock held for the duration of a `with` block."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._fd: int | None = None
+
+    def __enter__(self):
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+
+def train_dictionary(samples: list[bytes], size: int = _DICT_SIZE) -> bytes:
+    """
+    Builds a zlib preset dictionary from sample pages.
+
+    Phrases that occur in at least two samples (navigation, cookie notices,
+    footers and other boilerplate) are collected, most frequent last because
+    zlib encodes matches near the end of the dictionary most cheaply. Returns
+    an empty dictionary if there are too few samples or nothing in common.
+    """
+    if len(samples) < _DICT_MIN_SAMPLES:
+        return b""
+    documents = [sample.split() for sample in samples]
+
+    def shingles(words: list[bytes]) -> set[bytes]:
+        return {
+            b" ".join(words[i : i + _DICT_SHINGLE_WORDS])
+            for i in range(len(words) - _DICT_SHINGLE_WORDS + 1)
+        }
+
+    shingle_counts: Counter[bytes] = Counter()
+    for words in documents:
+        shingle_counts.update(shingles(words))
+
+    # 共通する shingle が連続する区間を 1 つのフレーズとしてまとめ、重複を避ける
+    phrase_counts: Counter[bytes] = Counter()
+    for words in documents:
+        phrases = set()
+        start = end = None
+        for i in range(len(words) - _DICT_SHINGLE_WORDS + 1):
+            shingle = b" ".join(words[i : i + _DICT_SHINGLE_WORDS])
+            if shingle_counts[shingle] < 2:
+                continue
+            if end is not None and i <= end:
+                end = i + _DICT_SHINGLE_WORDS
+                continue
+            if start is not None:
+                phrases.add(b" ".join(words[start:end]))
+            start, end = i, i + _DICT_SHINGLE_WORDS
+        if start is not None:
+            phrases.add(b" ".join(words[start:end]))
+        phrase_counts.update(phrases)
+
+    common = sorted(
+        (count, phrase) for phrase, count in phrase_counts.items() if count >= 2
+    )
+    parts: list[bytes] = []
+    total = 0
+    for _, phrase in reversed(common):
+        if total + len(phrase) + 1 > size:
+            continue
+        parts.append(phrase)
+        total += len(phrase) + 1
+    return b" ".join(reversed(parts))
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+
+class _PendingBatch:
+    """A group of items that will be handled by a single handler call."""
+
+    def __init__(self):
+        self.items: list[Any] = []
+        self.results: list[Any] = []
+        self.done = threading.Event()
+
+
+class SummarizationBatcher:
+    """
+    Coalesces concurrent submissions into batches.
+
+    The first caller to arrive opens a batch and becomes its leader. It waits up
+    to `window_seconds` (or until `max_size` items have joined), then runs the
+    handler once for the whole batch on behalf of every caller. The other callers
+    simply block until the leader publishes the results.
+    """
+
+    def __init__(self, window_seconds: float, max_size: int):
+        self.window_seconds = window_seconds
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._batch_full = threading.Condition(self._lock)
+        self._open_batch: _PendingBatch | None = None
+
+    def submit(self, item: Any, handler: Callable[[list[Any]], list[Any]]) -> Any:
+        """
+        Adds an item to the open batch and waits for its result.
+
+        Args:
+            item: The item to process.
+            handler: Called by the batch leader with all batched items. It must
+                     return one result per item, in order. A result that is an
+                     exception instance is raised to the corresponding caller.
+
+        Returns:
+            The handler's result for this item.
+        """
+        with self._lock:
+            batch = self._open_batch
+            is_leader = batch is None
+            if is_leader:
+                batch = self._open_batch = _PendingBatch()
+            index = len(batch.items)
+            batch.items.append(item)
+            if len(batch.items) >= self.max_size:
+                self._open_batch = None
+                self._batch_full.notify_all()
+
+        if is_leader:
+            self._collect(batch)
+            try:
+                batch.results = list(handler(list(batch.items)))
+                if len(batch.results) != len(batch.items):
+                    raise RuntimeError(
+                        "Batch handler returned a wrong number of results."
+                    )
+            except Exception as e:
+                batch.results = [e] * len(batch.items)
+            finally:
+                batch.done.set()
+        else:
+            batch.done.wait()
+
+        result = batch.results[index]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _collect(self, batch: _PendingBatch) -> None:
+        """Waits for the collection window to elapse, then closes the batch."""
+        deadline = time.monotonic() + self.window_seconds
+        with self._lock:
+            while self._open_batch is batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._open_batch = None
+                    break
+                self._batch_full.wait(remaining)
@@ -1,4 +1,8 @@
 import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
 
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
@@ -6,8 +10,25 @@ from requests.exceptions import RequestException
 
 from apps.gist.clients.llm_api_client import LlmApiClient
 
+from .model_router import model_router
+from .summarization_batcher import SummarizationBatcher
+
 logger = logging.getLogger(__name__)
 
+SUMMARY_FORMAT_INSTRUCTIONS = """要約は以下の形式で出力してください。
+タイトル: 記事の内容を一行で表すタイトルを1つ生成してください。
+要点: 記事の最も重要なポイントを3つを目安として、最大5つまでの箇条書きで簡潔にまとめてください。各箇条書きは100字以内にしてください。
+"""
+
+_BATCH_SUMMARY_HEADER_RE = re.compile(r"^\s*=== 要約 (\d+) ===\s*$", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class _SingleCall:
+    """Tells a batched caller to summarize its text with its own LLM call."""
+
+    model: str
+
 
 class SummarizationServiceError(Exception):
     """A custom exception for errors during the summarization process."""
@@ -20,15 +41,19 @@ class SummarizationService:
     A service for summarizing web page content.
     """
 
+    _batcher: SummarizationBatcher | None = None
+    _batcher_lock = threading.Lock()
+
     def __init__(self):
         try:
             self.llm_client = LlmApiClient()
-            self.model = settings.SUMMARIZATION_MODEL
         except ImproperlyConfigured as e:
             # Re-raise as a service-specific exception to decouple from the client
             raise SummarizationServiceError(f"Service not configured: {e}") from e
 
-    def summarize(self, text: str, max_chars: int | None = None) -> str:
+    def summarize(
+        self, text: str, max_chars: int | None = None, quality: str = "auto"
+    ) -> str:
         """
         Summarizes the given text using the LLM API.
 
@@ -36,12 +61,15 @@ class SummarizationService:
             text: The text content to summarize.
             max_chars: The maximum number of characters of the text to use.
                        Defaults to settings.SUMMARY_MAX_CHARS.
+            quality: "auto" lets the model router pick the model, "fast" and
+                     "high" pin the fast or the default model.
 
         Returns:
             The summarized text.
 
         Raises:
             SummarizationServiceError: If the summarization fails.
+            ValueError: If quality is not a known tier.
         """
         if not text or not text.strip():
             return ""
@@ -50,10 +78,27 @@ class SummarizationService:
             max_chars = settings.SUMMARY_MAX_CHARS
 
         truncated_text = text[:max_chars]
-        prompt = self._build_prompt(truncated_text)
+
+        if (
+            settings.SUMMARY_BATCH_ENABLED
+            and quality == "auto"
+            and len(truncated_text) <= settings.SUMMARY_BATCH_SHORT_CHARS
+        ):
+            result = self._get_batcher().submit(truncated_text, self._summarize_batch)
+            if isinstance(result, _SingleCall):
+                # 各呼び出し元のスレッドで並行して呼ぶため、待ち時間は 1 回分で済む
+                return self._summarize_single(truncated_text, result.model)
+            return result
+
+        decision = model_router.choose(len(truncated_text), quality)
+        return self._summarize_single(truncated_text, decision.model)
+
+    def _summarize_single(self, text: str, model: str) -> str:
+        """Summarizes one (already truncated) text with a dedicated LLM call."""
+        prompt = self._build_prompt(text)
 
         try:
-            summary = self.llm_client.generate(prompt=prompt, model=self.model)
+            summary = self._generate(prompt, model)
             return summary.strip()
         except RequestException as e:
             logger.error(f"Summarization failed due to an API error: {e}")
@@ -61,6 +106,60 @@ class SummarizationService:
                 "要約の生成に失敗しました。外部APIとの通信中にエラーが発生しました。"
             ) from e
 
+    def _summarize_batch(self, texts: list[str]) -> list[str] | list[_SingleCall]:
+        """
+        Summarizes several short texts with a single LLM call.
+
+        If the combined request fails or its response cannot be split back
+        into exactly one summary per text, every caller is told to make its own
+        call instead, so the fallback calls run concurrently rather than one
+        after another in the batch leader.
+        """
+        model = model_router.choose(max(len(text) for text in texts)).model
+        if len(texts) > 1:
+            prompt = self._build_batch_prompt(texts)
+            try:
+                response = self._generate(prompt, model, record_latency=False)
+            except RequestException as e:
+                logger.warning(
+                    f"Batched summarization failed, falling back to single calls: {e}"
+                )
+            else:
+                summaries = self._parse_batch_response(response, len(texts))
+                if summaries is not None:
+                    return summaries
+                logger.warning(
+                    "Could not parse batched summary response, falling back to single calls."
+                )
+
+        return [_SingleCall(model)] * len(texts)
+
+    def _generate(self, prompt: str, model: str, record_latency: bool = True) -> str:
+        """
+        Calls the LLM and feeds the call's latency back to the model router.
+
+        Batched calls pass `record_latency=False`: they take longer than a
+        single summary, so recording them would inflate the p90 that the SLO
+        routing compares against single-call latency.
+        """
+        started = time.monotonic()
+        try:
+            return self.llm_client.generate(prompt=prompt, model=model)
+        finally:
+            if record_latency:
+                model_router.record_latency(model, time.monotonic() - started)
+
+    @classmethod
+    def _get_batcher(cls) -> SummarizationBatcher:
+        """Returns the process-wide batcher, creating it on first use."""
+        with cls._batcher_lock:
+            if cls._batcher is None:
+                cls._batcher = SummarizationBatcher(
+                    window_seconds=settings.SUMMARY_BATCH_WINDOW_MS / 1000,
+                    max_size=settings.SUMMARY_BATCH_MAX_SIZE,
+                )
+            return cls._batcher
+
     def _build_prompt(self, text: str) -> str:
         """Constructs the prompt for the summarization task."""
         return f"""以下のテキストを日本語で要約してください。
@@ -68,7 +167,39 @@ class SummarizationService:
 テキスト:
 {text}
 
-要約は以下の形式で出力してください。
-タイトル: 記事の内容を一行で表すタイトルを1つ生成してください。
-要点: 記事の最も重要なポイントを3つを目安として、最大5つまでの箇条書きで簡潔にまとめてください。各箇条書きは100字以内にしてください。
+{SUMMARY_FORMAT_INSTRUCTIONS}"""
+
+    def _build_batch_prompt(self, texts: list[str]) -> str:
+        """Constructs a prompt that asks for one summary per delimited text."""
+        sections = "\n\n".join(
+            f"=== テキスト {i} ===\n{text}" for i, text in enumerate(texts, start=1)
+        )
+        return f"""以下の{len(texts)}件のテキストを、それぞれ個別に日本語で要約してください。
+各テキストは「=== テキスト 番号 ===」の行で区切られています。
+
+{sections}
+
+{SUMMARY_FORMAT_INSTRUCTIONS}
+各要約の直前に「=== 要約 番号 ===」の行を置き、テキストと同じ番号・同じ順番で{len(texts)}件すべての要約を出力してください。
 """
+
+    @staticmethod
+    def _parse_batch_response(response: str, count: int) -> list[str] | None:
+        """
+        Splits a batched response into individual summaries.
+
+        Returns None unless the response contains exactly one non-empty summary
+        for each of the numbers 1..count.
+        """
+        headers = list(_BATCH_SUMMARY_HEADER_RE.finditer(response or ""))
+        summaries: dict[int, str] = {}
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(response)
+            number = int(header.group(1))
+            body = response[header.end() : end].strip()
+            if number in summaries or not body:
+                return None
+            summaries[number] = body
+        if sorted(summaries) != list(range(1, count + 1)):
+            return None
+        return [summaries[number] for number in range(1, count + 1)]
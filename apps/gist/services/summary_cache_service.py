@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+SummaryLoader = Callable[[], tuple[str, str]]
+
+# 更新中フラグの有効期限 (LLM の read timeout より長くしておく)
+_REFRESH_LOCK_SECONDS = 180
+
+
+@dataclass(frozen=True)
+class CachedSummary:
+    scraped_content: str
+    summary: str
+    stale: bool = False
+
+
+class SummaryCacheService:
+    """
+    A TTL cache of summaries per URL with refresh-ahead and stale-while-revalidate.
+
+    - Entries are fresh for `SUMMARY_CACHE_TTL` seconds and then served stale
+      for up to `SUMMARY_CACHE_STALE_SECONDS` while a background refresh runs.
+    - Hot entries (at least `SUMMARY_CACHE_HOT_HITS` hits within a TTL) are
+      refreshed in the background once they are within
+      `SUMMARY_CACHE_REFRESH_AHEAD_SECONDS` of expiring, so they never expire.
+    - Concurrent misses for the same URL in one process share a single load.
+
+    Entries live in the cache shared by all workers; refreshes run on a small
+    per-process thread pool and are de-duplicated across workers with a cache
+    flag. A `SUMMARY_CACHE_TTL` of 0 disables caching.
+    """
+
+    _lock = threading.Lock()
+    _executor: ThreadPoolExecutor | None = None
+    _refreshing: set[str] = set()
+    _in_flight: dict[str, Future] = {}
+
+    @classmethod
+    def get_or_load(
+        cls, url: str, quality: str, loader: SummaryLoader
+    ) -> CachedSummary:
+        """
+        Returns the cached summary for `url`, calling `loader` on a miss.
+
+        Args:
+            url: The summarized URL.
+            quality: The requested quality tier; tiers are cached separately.
+            loader: Scrapes and summarizes the URL, returning
+                    (scraped_content, summary). Its exceptions propagate on a miss.
+        """
+        if settings.SUMMARY_CACHE_TTL <= 0:
+            return CachedSummary(*loader())
+
+        cache = caches[settings.SUMMARY_CACHE_ALIAS]
+        key = cls._cache_key(url, quality)
+        entry = cache.get(key)
+        if entry is None:
+            return CachedSummary(*cls._load_single_flight(key, loader))
+
+        hits = cls._count_hit(key)
+        remaining = entry["fresh_until"] - time.time()
+        if remaining <= 0:
+            cls._schedule_refresh(key, loader)
+            return CachedSummary(entry["scraped_content"], entry["summary"], stale=True)
+        if (
+            hits >= settings.SUMMARY_CACHE_HOT_HITS
+            and remaining <= settings.SUMMARY_CACHE_REFRESH_AHEAD_SECONDS
+        ):
+            cls._schedule_refresh(key, loader)
+        return CachedSummary(entry["scraped_content"], entry["summary"])
+
+    @staticmethod
+    def _cache_key(url: str, quality: str) -> str:
+        digest = hashlib.sha256(f"{quality}\0{url}".encode("utf-8")).hexdigest()
+        return f"summary:{digest[:32]}"
+
+    @staticmethod
+    def _store(key: str, scraped_content: str, summary: str) -> None:
+        # 空の要約 (HTML 以外など) はキャッシュしない
+        if not summary:
+            return
+        ttl = settings.SUMMARY_CACHE_TTL
+        caches[settings.SUMMARY_CACHE_ALIAS].set(
+            key,
+            {
+                "scraped_content": scraped_content,
+                "summary": summary,
+                "fresh_until": time.time() + ttl,
+            },
+            ttl + settings.SUMMARY_CACHE_STALE_SECONDS,
+        )
+
+    @staticmethod
+    def _count_hit(key: str) -> int:
+        """Increments and returns the hit counter of the current TTL window."""
+        cache = caches[settings.SUMMARY_CACHE_ALIAS]
+        hits_key = f"{key}:hits"
+        cache.add(hits_key, 0, settings.SUMMARY_CACHE_TTL)
+        try:
+            return cache.incr(hits_key)
+        except ValueError:
+            # add と incr の間にカウンタが失効した
+            return 1
+
+    @classmethod
+    def _load_single_flight(cls, key: str, loader: SummaryLoader) -> tuple[str, str]:
+        with cls._lock:
+            future = cls._in_flight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = cls._in_flight[key] = Future()
+        if not is_owner:
+            return future.result()
+
+        try:
+            value = loader()
+            cls._store(key, *value)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with cls._lock:
+                cls._in_flight.pop(key, None)
+
+    @classmethod
+    def _schedule_refresh(cls, key: str, loader: SummaryLoader) -> None:
+        cache = caches[settings.SUMMARY_CACHE_ALIAS]
+        with cls._lock:
+            if key in cls._refreshing:
+                return
+            # 他のワーカーが既に更新中なら何もしない
+            if not cache.add(f"{key}:refreshing", 1, _REFRESH_LOCK_SECONDS):
+                return
+            cls._refreshing.add(key)
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(
+                    max_workers=settings.SUMMARY_CACHE_REFRESH_WORKERS,
+                    thread_name_prefix="summary-refresh",
+                )
+            executor = cls._executor
+        executor.submit(cls._refresh, key, loader)
+
+    @classmethod
+    def _refresh(cls, key: str, loader: SummaryLoader) -> None:
+        try:
+            cls._store(key, *loader())
+        except Exception:
+            # 失敗しても古い要約は stale 期間中は引き続き返される
+            logger.exception("Background refresh of cached summary %s failed.", key)
+        finally:
+            caches[settings.SUMMARY_CACHE_ALIAS].delete(f"{key}:refreshing")
+            with cls._lock:
+                cls._refreshing.discard(key)
@@ -0,0 +1,206 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+
+from .model_router import model_router
+from .snapshot_store import FileLock
+
+logger = logging.getLogger(__name__)
+
+# 各ワーカーが自分の状態をファイルに書き出す間隔
+_FLUSH_SECONDS = 5
+_LOCK_FILE = ".lock"
+# 終了したワーカーのカウンタを合算して保持するファイル
+_RETIRED_FILE = "retired.json"
+# collect() が返す、終了したワーカーの合算値の pid
+RETIRED_PID = 0
+
+
+@dataclass(frozen=True)
+class WorkerState:
+    pid: int
+    alive: bool
+    state: dict
+
+
+class WorkerMetrics:
+    """
+    Shares the model router's per-process metrics between Gunicorn workers.
+
+    Each worker writes its decision counters and latency p90s to
+    `METRICS_DIR/<pid>.json` every few seconds from a background thread, so
+    `/metrics` can report the whole container no matter which worker serves
+    it. Files left by exited workers are folded into a single retired total
+    and deleted, so totals never go down and the directory does not grow as
+    workers are recycled; the Gunicorn master clears the directory when it
+    starts.
+    """
+
+    _lock = threading.Lock()
+    _thread_pid: int | None = None
+    _flushed_pid: int | None = None
+
+    @classmethod
+    def start(cls) -> None:
+        """Starts the flush thread in this process."""
+        # fork 後の子プロセスにはスレッドが引き継がれないため pid で判定する
+        with cls._lock:
+            if cls._thread_pid == os.getpid():
+                return
+            cls._thread_pid = os.getpid()
+            threading.Thread(
+                target=cls._flush_forever, name="metrics-flush", daemon=True
+            ).start()
+
+    @classmethod
+    def flush(cls) -> None:
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        pid = os.getpid()
+        path = directory / f"{pid}.json"
+        with FileLock(directory / _LOCK_FILE):
+            if cls._flushed_pid != pid:
+                # pid が再利用された場合、終了済みのプロセスのファイルを上書きする前に退避する
+                state = _read_state(path)
+                if state is not None:
+                    _retire(directory, [state])
+                cls._flushed_pid = pid
+            _write_state(path, model_router.export_state())
+
+    @classmethod
+    def collect(cls) -> list[WorkerState]:
+        """
+        Returns the latest state of every live worker, including this one,
+        followed by the summed counters of exited workers (pid `RETIRED_PID`).
+        """
+        cls.flush()
+        directory = Path(settings.METRICS_DIR)
+        workers = []
+        dead = []
+        with FileLock(directory / _LOCK_FILE):
+            for path in sorted(directory.glob("*.json")):
+                if not path.stem.isdigit():
+                    continue
+                state = _read_state(path)
+                if state is None:
+                    continue
+                pid = int(path.stem)
+                if _is_alive(pid):
+                    workers.append(WorkerState(pid, True, state))
+                else:
+                    dead.append((path, state))
+            if dead:
+                retired = _retire(directory, [state for _, state in dead])
+                for path, _ in dead:
+                    path.unlink(missing_ok=True)
+            else:
+                retired = _read_state(directory / _RETIRED_FILE) or {}
+        workers.append(WorkerState(RETIRED_PID, False, retired))
+        return workers
+
+    @staticmethod
+    def clear() -> None:
+        directory = Path(settings.METRICS_DIR)
+        if not directory.is_dir():
+            return
+        for path in directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+    @classmethod
+    def _flush_forever(cls) -> None:
+        while True:
+            time.sleep(_FLUSH_SECONDS)
+            try:
+                cls.flush()
+            except Exception:
+                logger.exception("Failed to write worker metrics.")
+
+
+def render_prometheus(workers: list[WorkerState]) -> str:
+    """
+    Renders worker states in Prometheus text format.
+
+    Decision counters are summed over all workers, including recycled ones.
+    Latency p90s cannot be combined, so they are reported per live worker.
+    """
+    decisions: Counter[tuple[str, str]] = Counter()
+    for worker in workers:
+        for model, reason, count in worker.state.get("decisions", []):
+            decisions[(model, reason)] += count
+
+    lines = [
+        "# HELP gist_summarization_routing_decisions_total Summarization requests routed to each model, by reason.",
+        "# TYPE gist_summarization_routing_decisions_total counter",
+    ]
+    for (model, reason), count in sorted(decisions.items()):
+        lines.append(
+            "gist_summarization_routing_decisions_total"
+            f'{{model="{_escape_label(model)}",reason="{reason}"}} {count}'
+        )
+    lines += [
+        "# HELP gist_summarization_latency_p90_seconds p90 LLM call latency over the routing window, per worker.",
+        "# TYPE gist_summarization_latency_p90_seconds gauge",
+    ]
+    for worker in workers:
+        if not worker.alive:
+            continue
+        for model, p90 in sorted(worker.state.get("latency_p90", {}).items()):
+            if p90 is not None:
+                lines.append(
+                    "gist_summarization_latency_p90_seconds"
+                    f'{{model="{_escape_label(model)}",pid="{worker.pid}"}} {p90:.3f}'
+                )
+    return "\n".join(lines) + "\n"
+
+
+def _retire(directory: Path, states: list[dict]) -> dict:
+    """Adds the counters of exited workers to the retired total and saves it."""
+    decisions: Counter[tuple[str, str]] = Counter()
+    for state in [_read_state(directory / _RETIRED_FILE) or {}, *states]:
+        for model, reason, count in state.get("decisions", []):
+            decisions[(model, reason)] += count
+    retired = {
+        "decisions": [
+            [model, reason, count]
+            for (model, reason), count in sorted(decisions.items())
+        ]
+    }
+    _write_state(directory / _RETIRED_FILE, retired)
+    return retired
+
+
+def _read_state(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text())
+    except (ValueError, OSError):
+        # 存在しない、または不正なファイルは無視する
+        return None
+
+
+def _write_state(path: Path, state: dict) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)
+
+
+def _is_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
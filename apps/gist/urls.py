@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 
 from . import views
 
@@ -7,4 +7,10 @@ app_name = "gist"
 app_name = "gist"
 urlpatterns = [
     path("", views.scrape_page, name="scrape_page"),
+    path("api/summarize/", views.summarize_api, name="summarize_api"),
+    path("metrics", views.metrics, name="metrics"),
+    re_path(r"^results/(?P<key>[0-9a-f]{32})/$", views.result_page, name="result_page"),
+    re_path(
+        r"^api/results/(?P<key>[0-9a-f]{32})/$", views.result_api, name="result_api"
+    ),
 ]
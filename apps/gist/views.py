@@ -1,44 +1,204 @@
+import json
 import logging
 
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST, require_safe
 
 from .services import (
+    ResultService,
     ScrapingService,
     SummarizationService,
     SummarizationServiceError,
+    SummaryCacheService,
+    WorkerMetrics,
+    render_prometheus,
 )
 
 logger = logging.getLogger(__name__)
 
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _summarize_url(url: str, quality: str = "auto") -> tuple[dict, int]:
+    """
+    URL をスクレイピングして要約する。
+
+    成功時は scraped_content / summary、失敗時は error を含む辞書、
+    および API レスポンスに使う HTTP ステータスを返す。
+    """
+    result = {}
+
+    def load() -> tuple[str, str]:
+        text = ScrapingService.scrape(url)
+        summarizer = SummarizationService()
+        return text, summarizer.summarize(text, quality=quality)
+
+    try:
+        cached = SummaryCacheService.get_or_load(url, quality, load)
+        text, summary = cached.scraped_content, cached.summary
+        result["scraped_content"] = text
+        result["summary"] = summary
+        if summary:
+            try:
+                result["result_key"] = ResultService.save(url, text, summary).key
+            except DatabaseError:
+                # 保存できなくても要約自体はユーザーに返す
+                logger.exception("Failed to store summary result for URL: %s", url)
+        return result, 200
+    except ValueError as e:
+        # 入力エラーはユーザーにそのまま伝える
+        result["error"] = str(e)
+        return result, 400
+    except SummarizationServiceError:
+        # 要約サービス固有のエラー
+        logger.exception("Summarization service error for URL: %s", url)
+        result["error"] = (
+            "要約サービスが現在利用できません。時間をおいて再度お試しください。"
+        )
+        return result, 503
+    except Exception:
+        # それ以外は詳細をログにのみ出し、ユーザーには定型文を返す
+        logger.exception("Error during scraping/summarization for URL: %s", url)
+        result["error"] = (
+            "処理中にエラーが発生しました。時間をおいて再度お試しください。"
+        )
+        return result, 500
+
 
 def scrape_page(request):
     context = {}
     if request.method == "POST":
         url = request.POST.get("url")
         if url:
-            try:
-                text = ScrapingService.scrape(url)
-                context["scraped_content"] = text
-
-                summarizer = SummarizationService()
-                summary = summarizer.summarize(text)
-                context["summary"] = summary
-            except ValueError as e:
-                # 入力エラーはユーザーにそのまま伝える
-                context["error"] = str(e)
-            except SummarizationServiceError:
-                # 要約サービス固有のエラー
-                logger.exception("Summarization service error for URL: %s", url)
-                context["error"] = (
-                    "要約サービスが現在利用できません。時間をおいて再度お試しください。"
-                )
-            except Exception:
-                # それ以外は詳細をログにのみ出し、ユーザーには定型文を返す
-                logger.exception("Error during scraping/summarization for URL: %s", url)
-                context["error"] = (
-                    "処理中にエラーが発生しました。時間をおいて再度お試しください。"
-                )
+            result, _ = _summarize_url(url)
+            context.update(result)
         else:
             context["error"] = "URLを入力してください。"
 
     return render(request, "gist/index.html", context)
+
+
+@csrf_exempt
+@require_POST
+def summarize_api(request):
+    """
+    要約とメタデータのみを JSON で返す API。
+
+    本文は大きくなりがちなため、include_content が指定された場合のみ含める。
+    """
+    if request.content_type == "application/json":
+        try:
+            payload = json.loads(request.body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            payload = None
+        if not isinstance(payload, dict):
+            return _json_response({"error": "JSON の形式が不正です。"}, status=400)
+    else:
+        payload = request.POST
+
+    url = payload.get("url")
+    if not url or not isinstance(url, str):
+        return _json_response({"error": "URLを入力してください。"}, status=400)
+
+    include_content = request.GET.get("include_content", payload.get("include_content"))
+    include_content = str(include_content).strip().lower() in _TRUE_VALUES
+
+    quality = payload.get("quality") or "auto"
+    if not isinstance(quality, str):
+        return _json_response({"error": "品質の指定が不正です。"}, status=400)
+
+    result, status = _summarize_url(url, quality=quality)
+    if status != 200:
+        return _json_response({"error": result["error"]}, status=status)
+
+    text = result["scraped_content"]
+    data = {
+        "url": url,
+        "summary": result["summary"],
+        "content_length": len(text),
+    }
+    if "result_key" in result:
+        data["permalink"] = request.build_absolute_uri(
+            reverse("gist:result_page", args=[result["result_key"]])
+        )
+    if include_content:
+        data["content"] = text
+    return _json_response(data)
+
+
+@require_safe
+def result_page(request, key):
+    """保存済みの要約結果のパーマリンク (HTML)。"""
+    return _result_response(
+        request,
+        key,
+        lambda result: render(request, "gist/result.html", {"result": result}),
+    )
+
+
+@require_safe
+def result_api(request, key):
+    """保存済みの要約結果のパーマリンク (JSON)。"""
+    include_content = (
+        request.GET.get("include_content", "").strip().lower() in _TRUE_VALUES
+    )
+
+    def build(result):
+        data = {
+            "url": result.url,
+            "summary": result.summary,
+            "content_length": len(result.scraped_content),
+        }
+        if include_content:
+            data["content"] = result.scraped_content
+        return _json_response(data)
+
+    return _result_response(request, key, build)
+
+
+@require_safe
+def metrics(request):
+    """要約モデルの振り分け状況 (全ワーカーの集計) を Prometheus 形式で返す。"""
+    response = HttpResponse(
+        render_prometheus(WorkerMetrics.collect()),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def _result_response(request, key, build_response):
+    """
+    ETag と Cache-Control を付けて保存済みの結果を返す。
+
+    キーは内容のハッシュで結果は不変のため、If-None-Match が一致すれば
+    キーの存在だけを確認して、本文を読み込まずに 304 を返せる。
+    """
+    # GZipMiddleware は圧縮時に強い ETag を弱める。圧縮の有無や保持期間後の本文の
+    # 削除で表現が変わっても意味は同じなので、最初から弱い ETag にして常に一致させる
+    etag = f"W/{quote_etag(key)}"
+    response = None
+    if "If-None-Match" in request.headers and ResultService.exists(key):
+        response = get_conditional_response(request, etag=etag)
+    if response is None:
+        result = ResultService.get(key)
+        if result is None:
+            raise Http404("指定の要約結果は見つかりませんでした。")
+        response = build_response(result)
+    response.headers["ETag"] = etag
+    patch_cache_control(
+        response, public=True, max_age=settings.RESULT_CACHE_MAX_AGE, immutable=True
+    )
+    return response
+
+
+def _json_response(data: dict, status: int = 200) -> JsonResponse:
+    # 日本語を \uXXXX にエスケープしないことでレスポンスサイズを抑える
+    return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
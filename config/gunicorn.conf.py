@@ -0,0 +1,140 @@
+"""
+Gunicorn configuration for the gist application.
+
+All values can be overridden with environment variables:
+
+- GUNICORN_WORKER_CLASS: "gthread" (default) or "sync". All views are
+  synchronous, so an ASGI worker would only serialize them.
+- GUNICORN_WORKERS / GUNICORN_THREADS: default to values derived from the CPUs
+  available to the container.
+- GUNICORN_MAX_REQUESTS / GUNICORN_MAX_REQUESTS_JITTER: worker recycling.
+- GUNICORN_PRELOAD: "true" (default) to load the app once in the master before
+  forking workers.
+
+See https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import math
+import os
+from pathlib import Path
+
+_WORKER_CLASSES = ("sync", "gthread")
+
+
+def _available_cpus() -> int:
+    """Returns the CPUs usable by this process, honouring cgroup v2 CPU quotas."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+        if quota != "max":
+            cpus = min(cpus, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cpus
+
+
+def _int_env(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise RuntimeError(f"{name} must be an integer.") from None
+    if value < 0:
+        raise RuntimeError(f"{name} must be a non-negative integer.")
+    return value
+
+
+_worker_model = os.getenv("GUNICORN_WORKER_CLASS", "gthread").strip().lower()
+if _worker_model not in _WORKER_CLASSES:
+    raise RuntimeError(
+        f"GUNICORN_WORKER_CLASS must be one of {', '.join(_WORKER_CLASSES)}."
+    )
+
+_cpus = _available_cpus()
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+wsgi_app = "config.wsgi:application"
+worker_class = _worker_model
+
+# 要約リクエストの大半は LLM の応答待ち (I/O) のため、gthread ではプロセスを CPU 数に
+# 抑えてスレッドで並行度を稼ぐ
+if _worker_model == "sync":
+    workers = _int_env("GUNICORN_WORKERS", 2 * _cpus + 1)
+else:
+    workers = _int_env("GUNICORN_WORKERS", _cpus)
+threads = _int_env("GUNICORN_THREADS", 8 if _worker_model == "gthread" else 1)
+workers = max(1, workers)
+threads = max(1, threads)
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").strip().lower() in (
+    "1",
+    "true",
+    "yes",
+    "on",
+)
+
+# メモリリーク対策としてワーカーを定期的に入れ替える (jitter で一斉再起動を防ぐ)
+max_requests = _int_env("GUNICORN_MAX_REQUESTS", 1000)
+max_requests_jitter = _int_env("GUNICORN_MAX_REQUESTS_JITTER", 100)
+
+# LLM API の read timeout (120 秒) より長くしておく
+timeout = _int_env("GUNICORN_TIMEOUT", 150)
+graceful_timeout = _int_env("GUNICORN_GRACEFUL_TIMEOUT", 30)
+keepalive = _int_env("GUNICORN_KEEPALIVE", 5)
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    """
+    Imports the heavy request-path modules in the master.
+
+    With preload_app, workers inherit them through fork instead of importing
+    them on their first request. Also removes the metrics files of workers
+    from a previous run.
+    """
+    import django
+    from django.apps import apps as django_apps
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    if not django_apps.ready:
+        django.setup()
+    from apps.gist.services import WorkerMetrics
+
+    WorkerMetrics.clear()
+
+    if not preload_app:
+        return
+    from django.urls import get_resolver
+
+    # URLconf は初回リクエストまで読み込まれないため、ここで views / services
+    # (bs4, requests を含む) をまとめて import する
+    get_resolver().url_patterns
+    server.log.info(
+        "Warm-up imports done (%s workers x %s threads, %s).",
+        workers,
+        threads,
+        worker_class,
+    )
+
+
+def post_worker_init(worker):
+    """
+    Runs the first readiness probe and starts the readiness refresher and the
+    metrics flush thread.
+
+    The probe pings the LLM API through the worker's pooled session, so it also
+    opens the first keep-alive connection before any request arrives.
+    """
+    from apps.gist.services import ReadinessService, WorkerMetrics
+
+    WorkerMetrics.start()
+    status = ReadinessService.start()
+    if status.checks.get("llm"):
+        worker.log.info("Primed LLM API connection pool.")
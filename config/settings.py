@@ -25,10 +25,71 @@ env_path = BASE_DIR / ".env"
 if env_path.is_file():
     load_dotenv(dotenv_path=env_path)
 
+# 真偽値として扱う環境変数の値
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
 # 環境変数からすべてのカスタム設定を読み込む
 LLM_API_ENDPOINT = os.getenv("LLM_API_ENDPOINT", "").strip() or None
 SUMMARIZATION_MODEL = os.getenv("SUMMARIZATION_MODEL", "gemma:2b").strip()
+SUMMARIZATION_FAST_MODEL = os.getenv("SUMMARIZATION_FAST_MODEL", "").strip()
+_summarization_routing_short_chars_raw = os.getenv(
+    "SUMMARIZATION_ROUTING_SHORT_CHARS", "300"
+)
+_summarization_latency_slo_ms_raw = os.getenv("SUMMARIZATION_LATENCY_SLO_MS", "15000")
+_summarization_latency_window_seconds_raw = os.getenv(
+    "SUMMARIZATION_LATENCY_WINDOW_SECONDS", "300"
+)
 _summary_max_chars_raw = os.getenv("SUMMARY_MAX_CHARS", "600")
+_summary_batch_enabled_raw = os.getenv("SUMMARY_BATCH_ENABLED", "false")
+_summary_batch_short_chars_raw = os.getenv("SUMMARY_BATCH_SHORT_CHARS", "300")
+_summary_batch_window_ms_raw = os.getenv("SUMMARY_BATCH_WINDOW_MS", "20")
+_summary_batch_max_size_raw = os.getenv("SUMMARY_BATCH_MAX_SIZE", "4")
+_profiling_sample_rate_raw = os.getenv("PROFILING_SAMPLE_RATE", "0")
+PROFILING_TRIGGER_HEADER = os.getenv("PROFILING_TRIGGER_HEADER", "X-Profile").strip()
+PROFILING_TRIGGER_TOKEN = os.getenv("PROFILING_TRIGGER_TOKEN", "").strip()
+PROFILING_OUTPUT_DIR = Path(
+    os.getenv("PROFILING_OUTPUT_DIR", "").strip() or BASE_DIR / "profiles"
+)
+# ワーカーごとのメトリクスを /metrics で集計するための共有ディレクトリ
+METRICS_DIR = Path(
+    os.getenv("METRICS_DIR", "").strip() or BASE_DIR / ".cache" / "metrics"
+)
+_profiling_max_files_raw = os.getenv("PROFILING_MAX_FILES", "50")
+_admission_max_concurrency_raw = os.getenv("ADMISSION_MAX_CONCURRENCY", "0")
+_admission_queue_target_ms_raw = os.getenv("ADMISSION_QUEUE_TARGET_MS", "0")
+_admission_queue_interval_ms_raw = os.getenv("ADMISSION_QUEUE_INTERVAL_MS", "100")
+_admission_retry_after_raw = os.getenv("ADMISSION_RETRY_AFTER", "5")
+_result_cache_max_age_raw = os.getenv("RESULT_CACHE_MAX_AGE", "86400")
+_readiness_refresh_seconds_raw = os.getenv("READINESS_REFRESH_SECONDS", "15")
+_rate_limit_enabled_raw = os.getenv("RATE_LIMIT_ENABLED", "false")
+_rate_limit_read_per_minute_raw = os.getenv("RATE_LIMIT_READ_PER_MINUTE", "300")
+_rate_limit_read_burst_raw = os.getenv("RATE_LIMIT_READ_BURST", "60")
+_rate_limit_llm_per_minute_raw = os.getenv("RATE_LIMIT_LLM_PER_MINUTE", "6")
+_rate_limit_llm_burst_raw = os.getenv("RATE_LIMIT_LLM_BURST", "3")
+RATE_LIMIT_API_KEYS = [
+    key.strip()
+    for key in os.getenv("RATE_LIMIT_API_KEYS", "").split(",")
+    if key.strip()
+]
+# プロキシを介さずに公開している環境では偽装できるため、既定ではソケットのアドレスを使う
+RATE_LIMIT_CLIENT_IP_HEADER = os.getenv("RATE_LIMIT_CLIENT_IP_HEADER", "").strip()
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "").strip() or None
+_summary_cache_ttl_raw = os.getenv("SUMMARY_CACHE_TTL", "0")
+_summary_cache_stale_seconds_raw = os.getenv("SUMMARY_CACHE_STALE_SECONDS", "600")
+_summary_cache_refresh_ahead_seconds_raw = os.getenv(
+    "SUMMARY_CACHE_REFRESH_AHEAD_SECONDS", "300"
+)
+_summary_cache_hot_hits_raw = os.getenv("SUMMARY_CACHE_HOT_HITS", "3")
+_summary_cache_refresh_workers_raw = os.getenv("SUMMARY_CACHE_REFRESH_WORKERS", "2")
+_scrape_max_bytes_raw = os.getenv("SCRAPE_MAX_BYTES", "10485760")
+_pdf_max_pages_raw = os.getenv("PDF_MAX_PAGES", "50")
+_snapshot_enabled_raw = os.getenv("SNAPSHOT_ENABLED", "false")
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "").strip() or BASE_DIR / "snapshots")
+_snapshot_retention_days_raw = os.getenv("SNAPSHOT_RETENTION_DAYS", "0")
+_snapshot_segment_max_bytes_raw = os.getenv("SNAPSHOT_SEGMENT_MAX_BYTES", "67108864")
+_snapshot_dict_max_record_bytes_raw = os.getenv(
+    "SNAPSHOT_DICT_MAX_RECORD_BYTES", "16384"
+)
 
 
 # 読み込んだ設定値を検証
@@ -54,6 +115,190 @@ try:
 except (ValueError, TypeError):
     raise ImproperlyConfigured("SUMMARY_MAX_CHARS must be a non-negative integer.")
 
+# 入力長・品質指定・レイテンシに応じた要約モデルの振り分け
+# (SUMMARIZATION_FAST_MODEL が空なら常に SUMMARIZATION_MODEL を使う)
+try:
+    SUMMARIZATION_ROUTING_SHORT_CHARS = int(_summarization_routing_short_chars_raw)
+    SUMMARIZATION_LATENCY_SLO_MS = int(_summarization_latency_slo_ms_raw)
+    SUMMARIZATION_LATENCY_WINDOW_SECONDS = int(
+        _summarization_latency_window_seconds_raw
+    )
+    if (
+        SUMMARIZATION_ROUTING_SHORT_CHARS < 0
+        or SUMMARIZATION_LATENCY_SLO_MS < 1
+        or SUMMARIZATION_LATENCY_WINDOW_SECONDS < 1
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "SUMMARIZATION_ROUTING_SHORT_CHARS must be a non-negative integer, and "
+        "SUMMARIZATION_LATENCY_SLO_MS and SUMMARIZATION_LATENCY_WINDOW_SECONDS "
+        "must be positive integers."
+    )
+
+# 短いテキストの要約リクエストを1回の LLM 呼び出しにまとめるバッチ処理の設定
+SUMMARY_BATCH_ENABLED = _summary_batch_enabled_raw.strip().lower() in _TRUE_VALUES
+
+try:
+    SUMMARY_BATCH_SHORT_CHARS = int(_summary_batch_short_chars_raw)
+    SUMMARY_BATCH_WINDOW_MS = int(_summary_batch_window_ms_raw)
+    SUMMARY_BATCH_MAX_SIZE = int(_summary_batch_max_size_raw)
+    if (
+        SUMMARY_BATCH_SHORT_CHARS < 0
+        or SUMMARY_BATCH_WINDOW_MS < 0
+        or SUMMARY_BATCH_MAX_SIZE < 1
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "SUMMARY_BATCH_SHORT_CHARS and SUMMARY_BATCH_WINDOW_MS must be non-negative "
+        "integers, and SUMMARY_BATCH_MAX_SIZE must be a positive integer."
+    )
+
+# リクエストのプロファイリング設定 (サンプリング率 0 かつトークン未設定なら無効)
+try:
+    PROFILING_SAMPLE_RATE = float(_profiling_sample_rate_raw)
+    if not 0 <= PROFILING_SAMPLE_RATE <= 1:
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "PROFILING_SAMPLE_RATE must be a number between 0 and 1."
+    )
+
+try:
+    PROFILING_MAX_FILES = int(_profiling_max_files_raw)
+    if PROFILING_MAX_FILES < 1:
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured("PROFILING_MAX_FILES must be a positive integer.")
+
+if PROFILING_TRIGGER_TOKEN and not PROFILING_TRIGGER_HEADER:
+    raise ImproperlyConfigured(
+        "PROFILING_TRIGGER_HEADER cannot be empty when PROFILING_TRIGGER_TOKEN is set."
+    )
+
+# 過負荷時に要約リクエストを早期に拒否するアドミッション制御 (0 で無効)
+try:
+    ADMISSION_MAX_CONCURRENCY = int(_admission_max_concurrency_raw)
+    ADMISSION_QUEUE_TARGET_MS = int(_admission_queue_target_ms_raw)
+    ADMISSION_QUEUE_INTERVAL_MS = int(_admission_queue_interval_ms_raw)
+    ADMISSION_RETRY_AFTER = int(_admission_retry_after_raw)
+    if (
+        ADMISSION_MAX_CONCURRENCY < 0
+        or ADMISSION_QUEUE_TARGET_MS < 0
+        or ADMISSION_QUEUE_INTERVAL_MS < 0
+        or ADMISSION_RETRY_AFTER < 0
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "ADMISSION_MAX_CONCURRENCY, ADMISSION_QUEUE_TARGET_MS, "
+        "ADMISSION_QUEUE_INTERVAL_MS and ADMISSION_RETRY_AFTER must be "
+        "non-negative integers."
+    )
+
+# 要約結果パーマリンクの Cache-Control max-age (秒)
+try:
+    RESULT_CACHE_MAX_AGE = int(_result_cache_max_age_raw)
+    if RESULT_CACHE_MAX_AGE < 0:
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured("RESULT_CACHE_MAX_AGE must be a non-negative integer.")
+
+# /ready の判定に使うバックグラウンドプローブの実行間隔 (秒)
+try:
+    READINESS_REFRESH_SECONDS = int(_readiness_refresh_seconds_raw)
+    if READINESS_REFRESH_SECONDS < 1:
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured("READINESS_REFRESH_SECONDS must be a positive integer.")
+
+# クライアントごとのトークンバケットによるレート制限
+RATE_LIMIT_ENABLED = _rate_limit_enabled_raw.strip().lower() in _TRUE_VALUES
+RATE_LIMIT_CACHE_ALIAS = "ratelimit"
+
+try:
+    RATE_LIMIT_READ_PER_MINUTE = int(_rate_limit_read_per_minute_raw)
+    RATE_LIMIT_READ_BURST = int(_rate_limit_read_burst_raw)
+    RATE_LIMIT_LLM_PER_MINUTE = int(_rate_limit_llm_per_minute_raw)
+    RATE_LIMIT_LLM_BURST = int(_rate_limit_llm_burst_raw)
+    if (
+        RATE_LIMIT_READ_PER_MINUTE < 1
+        or RATE_LIMIT_READ_BURST < 1
+        or RATE_LIMIT_LLM_PER_MINUTE < 1
+        or RATE_LIMIT_LLM_BURST < 1
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "RATE_LIMIT_READ_PER_MINUTE, RATE_LIMIT_READ_BURST, "
+        "RATE_LIMIT_LLM_PER_MINUTE and RATE_LIMIT_LLM_BURST must be positive "
+        "integers."
+    )
+
+# 取得するレスポンス本文の上限バイト数と、テキストを抽出する PDF の最大ページ数を検証
+try:
+    SCRAPE_MAX_BYTES = int(_scrape_max_bytes_raw)
+    PDF_MAX_PAGES = int(_pdf_max_pages_raw)
+    if SCRAPE_MAX_BYTES < 1 or PDF_MAX_PAGES < 1:
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "SCRAPE_MAX_BYTES and PDF_MAX_PAGES must be positive integers."
+    )
+
+# スクレイピング結果の圧縮アーカイブ (無効時は本文を DB に保存する)
+SNAPSHOT_ENABLED = _snapshot_enabled_raw.strip().lower() in _TRUE_VALUES
+
+try:
+    SNAPSHOT_RETENTION_DAYS = int(_snapshot_retention_days_raw)
+    SNAPSHOT_SEGMENT_MAX_BYTES = int(_snapshot_segment_max_bytes_raw)
+    SNAPSHOT_DICT_MAX_RECORD_BYTES = int(_snapshot_dict_max_record_bytes_raw)
+    if (
+        SNAPSHOT_RETENTION_DAYS < 0
+        or SNAPSHOT_SEGMENT_MAX_BYTES < 1
+        or SNAPSHOT_DICT_MAX_RECORD_BYTES < 0
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "SNAPSHOT_RETENTION_DAYS and SNAPSHOT_DICT_MAX_RECORD_BYTES must be "
+        "non-negative integers, and SNAPSHOT_SEGMENT_MAX_BYTES must be a positive "
+        "integer."
+    )
+
+if CACHE_REDIS_URL and urlparse(CACHE_REDIS_URL).scheme not in ("redis", "rediss"):
+    raise ImproperlyConfigured("CACHE_REDIS_URL must start with redis:// or rediss://.")
+
+# レート制限はリクエストごとに書き込むため、原子的に更新できる Redis を必須とする
+if RATE_LIMIT_ENABLED and not CACHE_REDIS_URL:
+    raise ImproperlyConfigured("RATE_LIMIT_ENABLED requires CACHE_REDIS_URL.")
+
+# URL ごとの要約キャッシュ (SUMMARY_CACHE_TTL が 0 なら無効)
+SUMMARY_CACHE_ALIAS = "summaries"
+
+try:
+    SUMMARY_CACHE_TTL = int(_summary_cache_ttl_raw)
+    SUMMARY_CACHE_STALE_SECONDS = int(_summary_cache_stale_seconds_raw)
+    SUMMARY_CACHE_REFRESH_AHEAD_SECONDS = int(_summary_cache_refresh_ahead_seconds_raw)
+    SUMMARY_CACHE_HOT_HITS = int(_summary_cache_hot_hits_raw)
+    SUMMARY_CACHE_REFRESH_WORKERS = int(_summary_cache_refresh_workers_raw)
+    if (
+        SUMMARY_CACHE_TTL < 0
+        or SUMMARY_CACHE_STALE_SECONDS < 0
+        or SUMMARY_CACHE_REFRESH_AHEAD_SECONDS < 0
+        or SUMMARY_CACHE_HOT_HITS < 1
+        or SUMMARY_CACHE_REFRESH_WORKERS < 1
+    ):
+        raise ValueError
+except (ValueError, TypeError):
+    raise ImproperlyConfigured(
+        "SUMMARY_CACHE_TTL, SUMMARY_CACHE_STALE_SECONDS and "
+        "SUMMARY_CACHE_REFRESH_AHEAD_SECONDS must be non-negative integers, and "
+        "SUMMARY_CACHE_HOT_HITS and SUMMARY_CACHE_REFRESH_WORKERS must be positive "
+        "integers."
+    )
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -64,7 +309,10 @@ SECRET_KEY = "django-insecure-&+b&$5acbee)+^*#i03fr*say6xn6(p3m+30*og@de3t2avt81
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = True
 
-ALLOWED_HOSTS = []
+# 空の場合、DEBUG では Django が localhost 系のみを許可する
+ALLOWED_HOSTS = [
+    host.strip() for host in os.getenv("ALLOWED_HOSTS", "").split(",") if host.strip()
+]
 
 
 # Application definition
@@ -80,6 +328,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.gist.middleware.HealthCheckMiddleware",
+    "apps.gist.middleware.ProfilingMiddleware",
+    "django.middleware.gzip.GZipMiddleware",
+    "apps.gist.middleware.RateLimitMiddleware",
+    "apps.gist.middleware.AdmissionControlMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -120,6 +373,40 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+
+# レート制限や要約キャッシュは全ワーカーで共有する必要があるため、Redis が設定されて
+# いなければコンテナ内のファイルキャッシュを使う (Redis の利用には redis パッケージが必要)
+def _shared_cache(name: str, max_entries: int) -> dict:
+    if CACHE_REDIS_URL:
+        return {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_REDIS_URL,
+            "KEY_PREFIX": name,
+        }
+    return {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": BASE_DIR / ".cache" / name,
+        "OPTIONS": {"MAX_ENTRIES": max_entries},
+    }
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # レート制限が無効なら使われないため、Redis が無い場合はディスクに書かない
+    RATE_LIMIT_CACHE_ALIAS: (
+        _shared_cache("ratelimit", max_entries=10000)
+        if CACHE_REDIS_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    ),
+    SUMMARY_CACHE_ALIAS: _shared_cache("summaries", max_entries=5000),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -11,10 +11,12 @@ if [ "${COLLECT_STATIC:-0}" = "1" ]; then
     python manage.py collectstatic --noinput
 fi
 
-# Apply database migrations
-echo "Applying database migrations..."
-python manage.py migrate
+# Apply database migrations (set RUN_MIGRATIONS=0 when migrations are run as a separate step)
+if [ "${RUN_MIGRATIONS:-1}" = "1" ]; then
+    echo "Applying database migrations..."
+    python manage.py migrate --noinput
+fi
 
-# Start the main process
+# Start the main process (worker model, counts and warm-up are set in config/gunicorn.conf.py)
 echo "Starting Gunicorn server..."
-exec python -m gunicorn config.wsgi:application --bind "${GUNICORN_BIND:-0.0.0.0:8000}"
+exec python -m gunicorn --config config/gunicorn.conf.py
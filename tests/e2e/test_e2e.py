@@ -20,3 +20,18 @@ async def test_index_page_loads():
     assert response.status_code == 200
     assert "<h1>Enter URL to Scrape</h1>" in response.text
     assert "<title>Web Page Scraper</title>" in response.text
+
+
+async def test_health_endpoint():
+    """
+    Performs an end-to-end test on the liveness endpoint ('/health').
+    """
+    host_bind_ip = os.getenv("HOST_BIND_IP", "127.0.0.1")
+    test_port = os.getenv("TEST_PORT", "8002")
+    health_url = f"http://{host_bind_ip}:{test_port}/health"
+
+    async with httpx.AsyncClient(timeout=30) as client:
+        response = await client.get(health_url)
+
+    assert response.status_code == 200
+    assert response.text == "ok"
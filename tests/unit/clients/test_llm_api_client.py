@@ -0,0 +1,80 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from apps.gist.clients import llm_api_client
+from apps.gist.clients.llm_api_client import LlmApiClient
+
+TEST_ENDPOINT = "http://llm.example.com"
+
+
+@override_settings(LLM_API_ENDPOINT=TEST_ENDPOINT)
+class TestLlmApiClient(SimpleTestCase):
+    @override_settings(LLM_API_ENDPOINT=None)
+    def test_init_requires_endpoint(self):
+        """
+        Test that the client refuses to start without LLM_API_ENDPOINT.
+        """
+        with self.assertRaises(ImproperlyConfigured):
+            LlmApiClient()
+
+    @patch("apps.gist.clients.llm_api_client._get_session")
+    def test_generate_uses_pooled_session(self, mock_get_session):
+        """
+        Test that generate posts through the shared session with the fixed timeouts.
+        """
+        # Given
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"response": "generated"}
+        mock_get_session.return_value.post.return_value = mock_response
+
+        # When
+        result = LlmApiClient().generate(prompt="prompt", model="model")
+
+        # Then
+        self.assertEqual(result, "generated")
+        args, kwargs = mock_get_session.return_value.post.call_args
+        self.assertEqual(args[0], f"{TEST_ENDPOINT}/api/v1/generate")
+        self.assertEqual(
+            kwargs["json"], {"prompt": "prompt", "model": "model", "stream": False}
+        )
+        self.assertEqual(kwargs["timeout"], (10, 120))
+
+    @patch("apps.gist.clients.llm_api_client._get_session")
+    def test_generate_reraises_request_errors(self, mock_get_session):
+        """
+        Test that network errors propagate to the service layer.
+        """
+        mock_get_session.return_value.post.side_effect = requests.ConnectionError(
+            "down"
+        )
+
+        with self.assertRaises(requests.ConnectionError):
+            LlmApiClient().generate(prompt="prompt", model="model")
+
+    @patch("apps.gist.clients.llm_api_client._get_session")
+    def test_ping(self, mock_get_session):
+        """
+        Test that ping reports whether the API was reachable.
+        """
+        client = LlmApiClient()
+
+        self.assertTrue(client.ping())
+        mock_get_session.return_value.head.assert_called_once_with(
+            TEST_ENDPOINT, timeout=(3, 3)
+        )
+
+        mock_get_session.return_value.head.side_effect = requests.ConnectionError()
+        self.assertFalse(client.ping())
+
+    def test_session_is_recreated_after_fork(self):
+        """
+        Test that each process gets its own session.
+        """
+        first = llm_api_client._get_session()
+        self.assertIs(llm_api_client._get_session(), first)
+
+        with patch("apps.gist.clients.llm_api_client.os.getpid", return_value=-1):
+            self.assertIsNot(llm_api_client._get_session(), first)
@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.gist.middleware import AdmissionControlMiddleware
+
+
+@override_settings(
+    ADMISSION_MAX_CONCURRENCY=1,
+    ADMISSION_QUEUE_TARGET_MS=0,
+    ADMISSION_QUEUE_INTERVAL_MS=100,
+    ADMISSION_RETRY_AFTER=7,
+)
+class TestAdmissionControlMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=HttpResponse("ok"))
+
+    @override_settings(ADMISSION_MAX_CONCURRENCY=0, ADMISSION_QUEUE_TARGET_MS=0)
+    def test_disabled_when_not_configured(self):
+        """
+        Test that the middleware removes itself when both limits are off.
+        """
+        with self.assertRaises(MiddlewareNotUsed):
+            AdmissionControlMiddleware(self.get_response)
+
+    def test_rejects_post_over_concurrency_limit(self):
+        """
+        Test that a POST is shed while another one is in flight, but GETs pass.
+        """
+        # Given: 1 件目の POST がビュー内でブロックしている
+        entered = threading.Event()
+        release = threading.Event()
+
+        def slow_view(request):
+            entered.set()
+            release.wait(5)
+            return HttpResponse("ok")
+
+        middleware = AdmissionControlMiddleware(slow_view)
+        worker = threading.Thread(target=middleware, args=(self.factory.post("/"),))
+        worker.start()
+        self.assertTrue(entered.wait(5))
+
+        try:
+            # When
+            shed = middleware(self.factory.post("/api/summarize/"))
+            with patch.object(middleware, "get_response", self.get_response):
+                cheap = middleware(self.factory.get("/"))
+        finally:
+            release.set()
+            worker.join(5)
+
+        # Then
+        self.assertEqual(shed.status_code, 503)
+        self.assertEqual(shed["Retry-After"], "7")
+        self.assertIn("error", json.loads(shed.content))
+        self.assertEqual(cheap.status_code, 200)
+
+    def test_slot_is_released_after_response(self):
+        """
+        Test that sequential POSTs are admitted once the previous one finished.
+        """
+        middleware = AdmissionControlMiddleware(self.get_response)
+
+        first = middleware(self.factory.post("/"))
+        second = middleware(self.factory.post("/"))
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 200)
+
+    @override_settings(ADMISSION_MAX_CONCURRENCY=0, ADMISSION_QUEUE_TARGET_MS=50)
+    def test_sheds_when_queue_delay_stays_above_target(self):
+        """
+        Test the CoDel rule: shed only after the delay stayed high for the interval.
+        """
+        middleware = AdmissionControlMiddleware(self.get_response)
+
+        def post(delay_seconds):
+            started = time.time() - delay_seconds
+            return middleware(
+                self.factory.post("/", HTTP_X_REQUEST_START=f"t={started:.3f}")
+            )
+
+        with patch(
+            "apps.gist.middleware.admission.time.monotonic",
+            side_effect=[0.0, 0.05, 0.2, 0.3],
+        ):
+            # 遅延が目標を超えた直後はまだ受け付ける
+            self.assertEqual(post(1.0).status_code, 200)
+            self.assertEqual(post(1.0).status_code, 200)
+            # interval (100ms) を超えて遅延が続いたら遮断する
+            self.assertEqual(post(1.0).status_code, 503)
+            # 遅延が目標を下回ったら遮断をやめる
+            self.assertEqual(post(0).status_code, 200)
+
+    def test_queue_delay_accepts_millisecond_timestamps(self):
+        """
+        Test that X-Request-Start in milliseconds is understood.
+        """
+        started_ms = (time.time() - 2) * 1000
+        request = self.factory.post("/", HTTP_X_REQUEST_START=f"t={started_ms:.0f}")
+
+        delay = AdmissionControlMiddleware._queue_delay(request)
+
+        self.assertAlmostEqual(delay, 2, delta=0.5)
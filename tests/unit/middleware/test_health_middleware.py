@@ -0,0 +1,69 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from apps.gist.middleware import HealthCheckMiddleware
+from apps.gist.services import ReadinessStatus
+
+
+class TestHealthCheckMiddleware(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=HttpResponse("view"))
+        self.middleware = HealthCheckMiddleware(self.get_response)
+
+    def test_health_short_circuits(self):
+        """
+        Test that /health answers without calling the rest of the stack.
+        """
+        response = self.middleware(self.factory.get("/health"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"ok")
+        self.assertEqual(response["Cache-Control"], "no-store")
+        self.get_response.assert_not_called()
+
+    @patch("apps.gist.middleware.health.ReadinessService.get_status")
+    def test_ready_when_all_checks_pass(self, mock_get_status):
+        """
+        Test that /ready returns 200 with the cached checks.
+        """
+        mock_get_status.return_value = ReadinessStatus(
+            checks={"llm": True, "database": True}, checked_at=0
+        )
+
+        response = self.middleware(self.factory.get("/ready"))
+
+        self.assertEqual(response.status_code, 200)
+        body = json.loads(response.content)
+        self.assertEqual(body["status"], "ready")
+        self.assertEqual(body["checks"], {"llm": True, "database": True})
+        self.assertEqual(body["checked_at"], "1970-01-01T00:00:00+00:00")
+        self.get_response.assert_not_called()
+
+    @patch("apps.gist.middleware.health.ReadinessService.get_status")
+    def test_not_ready_when_a_check_fails_or_not_probed_yet(self, mock_get_status):
+        """
+        Test that /ready returns 503 on a failed check and before the first probe.
+        """
+        for status in (
+            ReadinessStatus(checks={"llm": False, "database": True}, checked_at=0),
+            ReadinessStatus(),
+        ):
+            mock_get_status.return_value = status
+
+            response = self.middleware(self.factory.get("/ready"))
+
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(json.loads(response.content)["status"], "not_ready")
+
+    def test_other_paths_pass_through(self):
+        """
+        Test that regular requests reach the next middleware.
+        """
+        response = self.middleware(self.factory.get("/"))
+
+        self.assertEqual(response.content, b"view")
+        self.get_response.assert_called_once()
@@ -0,0 +1,91 @@
+import tempfile
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.gist.middleware import ProfilingMiddleware
+
+
+@override_settings(
+    PROFILING_SAMPLE_RATE=0,
+    PROFILING_TRIGGER_HEADER="X-Profile",
+    PROFILING_TRIGGER_TOKEN="secret",
+    PROFILING_MAX_FILES=2,
+)
+class TestProfilingMiddleware(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=HttpResponse("ok"))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+
+    def _middleware(self):
+        with self.settings(PROFILING_OUTPUT_DIR=self.output_dir):
+            return ProfilingMiddleware(self.get_response)
+
+    @override_settings(PROFILING_SAMPLE_RATE=0, PROFILING_TRIGGER_TOKEN="")
+    def test_disabled_when_not_configured(self):
+        """
+        Test that the middleware removes itself when profiling is off.
+        """
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(self.get_response)
+
+    def test_trigger_header_writes_profile(self):
+        """
+        Test that a request with the trusted header is profiled to a pstats file.
+        """
+        # Given
+        middleware = self._middleware()
+        request = self.factory.post("/", HTTP_X_PROFILE="secret")
+
+        # When
+        response = middleware(request)
+
+        # Then
+        self.assertEqual(response.content, b"ok")
+        profiles = list(self.output_dir.glob("*.prof"))
+        self.assertEqual(len(profiles), 1)
+        self.assertIn("-POST-root.prof", profiles[0].name)
+
+    def test_wrong_token_is_not_profiled(self):
+        """
+        Test that a request with an untrusted header value is not profiled.
+        """
+        middleware = self._middleware()
+
+        middleware(self.factory.get("/", HTTP_X_PROFILE="guess"))
+
+        self.get_response.assert_called_once()
+        self.assertEqual(list(self.output_dir.glob("*.prof")), [])
+
+    @override_settings(PROFILING_SAMPLE_RATE=0.5, PROFILING_TRIGGER_TOKEN="")
+    def test_sampling_rate(self):
+        """
+        Test that requests are profiled only when they win the sampling draw.
+        """
+        middleware = self._middleware()
+
+        with patch(
+            "apps.gist.middleware.profiling.random.random", side_effect=[0.9, 0.1]
+        ):
+            middleware(self.factory.get("/"))
+            self.assertEqual(list(self.output_dir.glob("*.prof")), [])
+            middleware(self.factory.get("/"))
+            self.assertEqual(len(list(self.output_dir.glob("*.prof"))), 1)
+
+    def test_ring_buffer_keeps_newest_files(self):
+        """
+        Test that only PROFILING_MAX_FILES profiles are kept.
+        """
+        middleware = self._middleware()
+
+        for _ in range(4):
+            middleware(self.factory.get("/", HTTP_X_PROFILE="secret"))
+
+        self.assertEqual(len(list(self.output_dir.glob("*.prof"))), 2)
+        self.assertEqual(list(self.output_dir.glob("*.tmp")), [])
@@ -0,0 +1,106 @@
+import json
+from unittest.mock import MagicMock
+
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from apps.gist.middleware import RateLimitMiddleware
+
+
+@override_settings(
+    RATE_LIMIT_ENABLED=True,
+    RATE_LIMIT_READ_PER_MINUTE=1,
+    RATE_LIMIT_READ_BURST=2,
+    RATE_LIMIT_LLM_PER_MINUTE=1,
+    RATE_LIMIT_LLM_BURST=1,
+    RATE_LIMIT_API_KEYS=["partner-key"],
+    RATE_LIMIT_CLIENT_IP_HEADER="X-Real-IP",
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "ratelimit": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-ratelimit-middleware",
+        },
+    },
+)
+class TestRateLimitMiddleware(TestCase):
+    def setUp(self):
+        caches["ratelimit"].clear()
+        self.factory = RequestFactory()
+        self.get_response = MagicMock(return_value=HttpResponse("ok"))
+        self.middleware = RateLimitMiddleware(self.get_response)
+
+    @override_settings(RATE_LIMIT_ENABLED=False)
+    def test_disabled_by_setting(self):
+        """
+        Test that the middleware removes itself when rate limiting is off.
+        """
+        with self.assertRaises(MiddlewareNotUsed):
+            RateLimitMiddleware(self.get_response)
+
+    def test_llm_requests_have_their_own_quota(self):
+        """
+        Test that POSTs are limited separately from cheap GETs.
+        """
+        ip = {"HTTP_X_REAL_IP": "203.0.113.1"}
+
+        first = self.middleware(self.factory.post("/", **ip))
+        second = self.middleware(self.factory.post("/api/summarize/", **ip))
+        read = self.middleware(self.factory.get("/", **ip))
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second["Retry-After"], "60")
+        self.assertIn("error", json.loads(second.content))
+        self.assertEqual(read.status_code, 200)
+
+    def test_clients_are_identified_by_ip_header(self):
+        """
+        Test that different client IPs get separate buckets.
+        """
+        self.middleware(self.factory.post("/", HTTP_X_REAL_IP="203.0.113.1"))
+
+        response = self.middleware(self.factory.post("/", HTTP_X_REAL_IP="203.0.113.2"))
+
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER="")
+    def test_ip_header_is_ignored_unless_configured(self):
+        """
+        Test that without a trusted header, rotating X-Real-IP does not give a
+        client a fresh bucket.
+        """
+        middleware = RateLimitMiddleware(self.get_response)
+        middleware(self.factory.post("/", HTTP_X_REAL_IP="203.0.113.1"))
+
+        response = middleware(self.factory.post("/", HTTP_X_REAL_IP="203.0.113.2"))
+
+        self.assertEqual(response.status_code, 429)
+
+    def test_known_api_key_gets_its_own_bucket(self):
+        """
+        Test that a configured API key is limited independently of its IP,
+        while unknown keys fall back to the IP bucket.
+        """
+        ip = {"HTTP_X_REAL_IP": "203.0.113.1"}
+        self.middleware(self.factory.post("/", **ip))
+
+        with_key = self.middleware(
+            self.factory.post("/", HTTP_X_API_KEY="partner-key", **ip)
+        )
+        unknown_key = self.middleware(
+            self.factory.post("/", HTTP_X_API_KEY="made-up", **ip)
+        )
+
+        self.assertEqual(with_key.status_code, 200)
+        self.assertEqual(unknown_key.status_code, 429)
+
+    def test_static_files_are_not_limited(self):
+        """
+        Test that static assets never consume tokens.
+        """
+        for _ in range(5):
+            response = self.middleware(self.factory.get("/static/app.css"))
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.gist.services.model_router import ModelRouter
+
+LARGE_MODEL = "large-model"
+FAST_MODEL = "fast-model"
+
+
+@override_settings(
+    SUMMARIZATION_MODEL=LARGE_MODEL,
+    SUMMARIZATION_FAST_MODEL=FAST_MODEL,
+    SUMMARIZATION_ROUTING_SHORT_CHARS=100,
+    SUMMARIZATION_LATENCY_SLO_MS=1000,
+    SUMMARIZATION_LATENCY_WINDOW_SECONDS=60,
+)
+class TestModelRouter(SimpleTestCase):
+    def setUp(self):
+        self.router = ModelRouter()
+
+    @override_settings(SUMMARIZATION_FAST_MODEL="")
+    def test_single_model_without_fast_model(self):
+        """
+        Test that every request uses SUMMARIZATION_MODEL when no fast model is set.
+        """
+        for quality in ("auto", "fast", "high"):
+            decision = self.router.choose(10, quality)
+            self.assertEqual(decision.model, LARGE_MODEL)
+            self.assertEqual(decision.reason, "single_model")
+
+    def test_routes_by_input_length(self):
+        """
+        Test that short inputs go to the fast model and long ones to the large one.
+        """
+        self.assertEqual(self.router.choose(100).model, FAST_MODEL)
+        self.assertEqual(self.router.choose(101).model, LARGE_MODEL)
+
+    def test_quality_tier_pins_model(self):
+        """
+        Test that explicit quality tiers override length-based routing.
+        """
+        self.assertEqual(self.router.choose(10, "high").model, LARGE_MODEL)
+        self.assertEqual(self.router.choose(5000, "fast").model, FAST_MODEL)
+
+    def test_invalid_quality(self):
+        """
+        Test that an unknown quality tier is rejected.
+        """
+        with self.assertRaises(ValueError):
+            self.router.choose(10, "best")
+
+    def test_shifts_to_fast_model_on_slo_breach_and_recovers(self):
+        """
+        Test that a slow large model sheds traffic until its samples expire.
+        """
+        with patch(
+            "apps.gist.services.model_router.time.monotonic", return_value=1000.0
+        ):
+            for _ in range(5):
+                self.router.record_latency(LARGE_MODEL, 2.0)
+            decision = self.router.choose(500)
+        self.assertEqual(decision.model, FAST_MODEL)
+        self.assertEqual(decision.reason, "slo_breach")
+
+        # ウィンドウ (60 秒) を過ぎるとサンプルが失効して大きいモデルに戻る
+        with patch(
+            "apps.gist.services.model_router.time.monotonic", return_value=1061.0
+        ):
+            decision = self.router.choose(500)
+        self.assertEqual(decision.model, LARGE_MODEL)
+
+    def test_too_few_samples_do_not_trigger_breach(self):
+        """
+        Test that a handful of slow calls is not enough to shift traffic.
+        """
+        for _ in range(4):
+            self.router.record_latency(LARGE_MODEL, 5.0)
+
+        self.assertIsNone(self.router.latency_p90(LARGE_MODEL))
+        self.assertEqual(self.router.choose(500).model, LARGE_MODEL)
+
+    def test_export_state(self):
+        """
+        Test that decisions and latencies are exported as JSON-serializable data.
+        """
+        self.router.choose(10)
+        self.router.choose(10)
+        for _ in range(5):
+            self.router.record_latency(FAST_MODEL, 0.5)
+        self.router.record_latency(LARGE_MODEL, 1.0)
+
+        state = self.router.export_state()
+
+        self.assertEqual(state["decisions"], [[FAST_MODEL, "short_input", 2]])
+        self.assertEqual(state["latency_p90"], {FAST_MODEL: 0.5, LARGE_MODEL: None})
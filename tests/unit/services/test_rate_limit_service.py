@@ -0,0 +1,86 @@
+import uuid
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from apps.gist.services.rate_limit_service import TokenBucketRateLimiter
+
+
+@pytest.fixture
+def cache():
+    # LocMemCache は同じ名前のインスタンス間で状態を共有するため、テストごとに名前を変える
+    return LocMemCache(f"test-ratelimit-{uuid.uuid4()}", {})
+
+
+class TestTokenBucketRateLimiter:
+    def test_allows_burst_then_limits(self, cache):
+        # Given: 1 分あたり 60 (毎秒 1) 回復、容量 3 のバケット
+        limiter = TokenBucketRateLimiter(cache, "llm", per_minute=60, burst=3)
+
+        # When: 同時刻に 4 回消費
+        with patch(
+            "apps.gist.services.rate_limit_service.time.time", return_value=1000.0
+        ):
+            results = [limiter.consume("ip:1.2.3.4") for _ in range(4)]
+
+        # Then: 3 回までは許可され、4 回目は 1 秒後に再試行するよう返る
+        assert results[:3] == [0.0, 0.0, 0.0]
+        assert results[3] == pytest.approx(1.0)
+
+    def test_tokens_refill_over_time(self, cache):
+        # Given: 使い切ったバケット
+        limiter = TokenBucketRateLimiter(cache, "llm", per_minute=60, burst=1)
+        with patch(
+            "apps.gist.services.rate_limit_service.time.time", return_value=1000.0
+        ):
+            assert limiter.consume("ip:1.2.3.4") == 0.0
+            assert limiter.consume("ip:1.2.3.4") > 0
+
+        # When: 1 秒経過
+        with patch(
+            "apps.gist.services.rate_limit_service.time.time", return_value=1001.0
+        ):
+            result = limiter.consume("ip:1.2.3.4")
+
+        # Then: 再び許可される
+        assert result == 0.0
+
+    def test_buckets_are_per_client_and_per_name(self, cache):
+        # Given: 容量 1 のバケットを 2 種類
+        llm = TokenBucketRateLimiter(cache, "llm", per_minute=1, burst=1)
+        read = TokenBucketRateLimiter(cache, "read", per_minute=1, burst=1)
+
+        # When / Then: クライアントやバケット名が違えば独立して消費される
+        assert llm.consume("ip:1.1.1.1") == 0.0
+        assert llm.consume("ip:2.2.2.2") == 0.0
+        assert read.consume("ip:1.1.1.1") == 0.0
+        assert llm.consume("ip:1.1.1.1") > 0
+
+    def test_redis_updates_bucket_atomically(self):
+        # Given: Redis キャッシュ (Lua スクリプトの実行結果を差し替える)
+        redis_cache = RedisCache("redis://localhost:6379/0", {"KEY_PREFIX": "rl"})
+        limiter = TokenBucketRateLimiter(redis_cache, "llm", per_minute=60, burst=3)
+        client = MagicMock()
+        client.register_script.return_value.side_effect = [[1, "2"], [0, "0.25"]]
+
+        # When: 2 回消費
+        with patch.object(redis_cache._cache, "get_client", return_value=client):
+            with patch(
+                "apps.gist.services.rate_limit_service.time.time",
+                return_value=1000.0,
+            ):
+                results = [limiter.consume("ip:1.2.3.4") for _ in range(2)]
+
+        # Then: get / set ではなくスクリプト 1 回で更新され、再試行までの秒数が返る
+        assert results == [0.0, pytest.approx(0.75)]
+        client.register_script.assert_called_once()
+        script = client.register_script.return_value
+        _, kwargs = script.call_args
+        assert kwargs["keys"] == [
+            redis_cache.make_and_validate_key(limiter._cache_key("ip:1.2.3.4"))
+        ]
+        assert kwargs["args"] == [1.0, 3, 1000.0, limiter.ttl]
+        client.get.assert_not_called()
+        client.set.assert_not_called()
@@ -0,0 +1,51 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from apps.gist.services.readiness_service import ReadinessService
+
+
+class TestReadinessService(TestCase):
+    @patch("apps.gist.services.readiness_service.LlmApiClient")
+    def test_refresh_caches_probe_results(self, mock_client_cls):
+        """
+        Test that refresh probes the LLM API and the database and caches the result.
+        """
+        # Given
+        mock_client_cls.return_value.ping.return_value = True
+
+        # When
+        status = ReadinessService.refresh()
+
+        # Then
+        self.assertTrue(status.ready)
+        self.assertEqual(status.checks, {"llm": True, "database": True})
+        self.assertIsNotNone(status.checked_at)
+        self.assertIs(ReadinessService._status, status)
+
+    @patch("apps.gist.services.readiness_service.LlmApiClient")
+    def test_unreachable_llm_is_not_ready(self, mock_client_cls):
+        """
+        Test that a failed LLM ping makes the service not ready.
+        """
+        mock_client_cls.return_value.ping.return_value = False
+
+        status = ReadinessService.refresh()
+
+        self.assertFalse(status.ready)
+        self.assertEqual(status.checks["llm"], False)
+
+    @patch("apps.gist.services.readiness_service.threading.Thread")
+    def test_get_status_probes_once_and_starts_refresher(self, mock_thread):
+        """
+        Test that the first get_status in a process has a result without waiting
+        for the background thread, and later calls only read the cached status.
+        """
+        with patch.object(ReadinessService, "_thread_pid", None):
+            with patch.object(ReadinessService, "refresh") as mock_refresh:
+                ReadinessService.get_status()
+                ReadinessService.get_status()
+
+        mock_refresh.assert_called_once()
+        mock_thread.assert_called_once()
+        mock_thread.return_value.start.assert_called_once()
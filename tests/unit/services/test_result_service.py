@@ -0,0 +1,88 @@
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.gist.models import SummaryResult
+from apps.gist.services.result_service import ResultService
+from apps.gist.services.snapshot_store import SnapshotStore
+
+
+class TestResultService(TestCase):
+    def test_compute_key_is_deterministic(self):
+        """
+        Test that the key depends only on the result content.
+        """
+        key = ResultService.compute_key("https://example.com", "text", "summary")
+
+        self.assertEqual(len(key), ResultService.KEY_LENGTH)
+        self.assertEqual(
+            key, ResultService.compute_key("https://example.com", "text", "summary")
+        )
+        self.assertNotEqual(
+            key, ResultService.compute_key("https://example.com", "text", "other")
+        )
+        # 区切り文字により境界をずらしても同じキーにならない
+        self.assertNotEqual(
+            ResultService.compute_key("a", "bc", "d"),
+            ResultService.compute_key("ab", "c", "d"),
+        )
+
+    def test_save_is_idempotent(self):
+        """
+        Test that saving the same result twice stores a single row.
+        """
+        first = ResultService.save("https://example.com", "text", "summary")
+        second = ResultService.save("https://example.com", "text", "summary")
+
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(SummaryResult.objects.count(), 1)
+
+    def test_get(self):
+        """
+        Test lookup by key, including unknown keys.
+        """
+        saved = ResultService.save("https://example.com", "text", "summary")
+
+        self.assertEqual(ResultService.get(saved.key), saved)
+        self.assertIsNone(ResultService.get("0" * 32))
+
+
+class TestResultServiceWithSnapshots(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(SNAPSHOT_ENABLED=True, SNAPSHOT_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def test_scraped_content_is_archived(self):
+        """
+        Test that the scraped text is kept in the archive instead of the database.
+        """
+        saved = ResultService.save("https://example.com", "text", "summary")
+
+        row = SummaryResult.objects.get(pk=saved.pk)
+        self.assertEqual(row.scraped_content, "")
+        self.assertEqual(row.content_hash, SnapshotStore.compute_key("text"))
+        self.assertEqual(saved.scraped_content, "text")
+        self.assertEqual(ResultService.get(saved.key).scraped_content, "text")
+        self.assertEqual(
+            ResultService.save(
+                "https://example.com", "text", "summary"
+            ).scraped_content,
+            "text",
+        )
+
+    def test_expired_snapshot_keeps_summary(self):
+        """
+        Test that a result whose text was compacted away is still served.
+        """
+        with patch("apps.gist.services.snapshot_store.time.time", return_value=0):
+            saved = ResultService.save("https://example.com", "text", "summary")
+        SnapshotStore.default().compact(retention_seconds=86400)
+
+        result = ResultService.get(saved.key)
+
+        self.assertEqual(result.summary, "summary")
+        self.assertEqual(result.scraped_content, "")
@@ -86,7 +86,7 @@ class TestScrapingService:
         """
         mock_response = MagicMock(spec=Response)
         mock_response.status_code = 200
-        mock_response.content = html_content.encode("utf-8")
+        mock_response.iter_content.return_value = [html_content.encode("utf-8")]
         mock_response.headers = {"Content-Type": "text/html"}
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
@@ -126,35 +126,166 @@ class TestScrapingService:
             ScrapingService.scrape(url)
 
     @patch("apps.gist.services.scraping_service.requests.get")
-    def test_scrape_non_html_content(self, mock_get):
-        # Given: 非 HTML コンテンツ (e.g. PDF) を返す mock
-        url = "http://example.com/file.pdf"
+    def test_scrape_unsupported_content_type(self, mock_get):
+        # Given: 対応していないコンテンツ (e.g. 画像) を返す mock
+        url = "http://example.com/image.png"
         mock_response = MagicMock(spec=Response)
         mock_response.status_code = 200
-        mock_response.content = b"%PDF-1.4..."
-        mock_response.headers = {"Content-Type": "application/pdf"}
+        mock_response.headers = {"Content-Type": "image/png"}
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
 
         # When: スクレイピングを実行
         result = ScrapingService.scrape(url)
 
-        # Then: 空文字列が返る
+        # Then: 本文を読まずに空文字列が返り、接続は閉じられる
         assert result == ""
         mock_response.raise_for_status.assert_called_once()
+        mock_response.iter_content.assert_not_called()
+        mock_response.close.assert_called_once()
 
     @patch("apps.gist.services.scraping_service.requests.get")
-    def test_scrape_text_plain_returns_empty(self, mock_get):
+    def test_scrape_text_plain_skips_html_parsing(self, mock_get):
+        # Given: 空白を含むプレーンテキストを返す mock
         url = "http://example.com/raw.txt"
         mock_resp = MagicMock(spec=Response)
         mock_resp.status_code = 200
-        mock_resp.content = b"plain text"
+        mock_resp.iter_content.return_value = [b"plain <b>text</b>\n\n", b"  here"]
+        mock_resp.headers = {"Content-Type": "text/plain; charset=utf-8"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: スクレイピングを実行
+        with patch("apps.gist.services.scraping_service.BeautifulSoup") as mock_soup:
+            result = ScrapingService.scrape(url)
+
+        # Then: タグも含めてそのまま使われ、空白だけが正規化される
+        assert result == "plain <b>text</b> here"
+        mock_soup.assert_not_called()
+        _, kwargs = mock_get.call_args
+        assert kwargs["stream"] is True
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_markdown_stops_at_budget(self, mock_get):
+        # Given: 要約の文字数予算を大きく超える markdown
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [b"# Title\n" + b"a" * 10_000]
+        mock_resp.headers = {"Content-Type": "text/markdown"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: 予算 20 文字でスクレイピングを実行
+        result = ScrapingService.scrape("http://example.com/README.md", max_chars=20)
+
+        # Then: 予算分だけ返る
+        assert result == "# Title " + "a" * 12
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_plain_text_is_not_truncated_by_default(self, mock_get, settings):
+        # Given: 要約の文字数予算より長いテキスト
+        settings.SUMMARY_MAX_CHARS = 10
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [b"x" * 1000]
         mock_resp.headers = {"Content-Type": "text/plain"}
         mock_resp.raise_for_status = MagicMock()
         mock_get.return_value = mock_resp
 
-        assert ScrapingService.scrape(url) == ""
-        mock_resp.raise_for_status.assert_called_once()
+        # When: max_chars を指定せずにスクレイピングを実行
+        result = ScrapingService.scrape("http://example.com/raw.txt")
+
+        # Then: 全文が返る
+        assert result == "x" * 1000
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_plain_text_cut_mid_character(self, mock_get):
+        # Given: charset 指定のない、予算を大きく超える日本語テキスト
+        body = ("a" + "日本語の文章です。" * 1000).encode("utf-8")
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = iter([body[:4000], body[4000:]])
+        mock_resp.headers = {"Content-Type": "text/plain"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: 予算 600 文字でスクレイピングを実行
+        result = ScrapingService.scrape("http://example.com/raw.txt", max_chars=600)
+
+        # Then: 予算分のバイトだけ読み、文字化けせずに返る
+        assert result == ("a" + "日本語の文章です。" * 1000)[:600]
+        _, kwargs = mock_resp.iter_content.call_args
+        assert kwargs["chunk_size"] <= 600 * 8 + 1
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_pdf_extracts_text_per_page(self, mock_get, settings):
+        # Given: 3 ページの PDF と、2 ページまでの上限
+        settings.PDF_MAX_PAGES = 2
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [
+            _build_pdf(["First page", "Second page", "Third page"])
+        ]
+        mock_resp.headers = {"Content-Type": "application/pdf"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: スクレイピングを実行
+        result = ScrapingService.scrape("http://example.com/file.pdf")
+
+        # Then: 上限までのページのテキストが返る
+        assert result == "First page Second page"
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_pdf_stops_at_budget(self, mock_get):
+        # Given: 1 ページ目だけで予算を満たす PDF
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [_build_pdf(["First page", "Second"])]
+        mock_resp.headers = {"Content-Type": "application/pdf"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: 予算 5 文字でスクレイピングを実行
+        with patch("pypdf.PageObject.extract_text", return_value="First page") as ext:
+            result = ScrapingService.scrape("http://example.com/file.pdf", max_chars=5)
+
+        # Then: 2 ページ目は抽出されない
+        assert result == "First"
+        ext.assert_called_once()
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_pdf_invalid_returns_empty(self, mock_get):
+        # Given: 壊れた PDF を返す mock
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [b"%PDF-1.4..."]
+        mock_resp.headers = {"Content-Type": "application/pdf"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: スクレイピングを実行
+        result = ScrapingService.scrape("http://example.com/file.pdf")
+
+        # Then: 空文字列が返る
+        assert result == ""
+
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_pdf_too_large(self, mock_get, settings):
+        # Given: 上限バイト数を超える PDF
+        settings.SCRAPE_MAX_BYTES = 8
+        mock_resp = MagicMock(spec=Response)
+        mock_resp.status_code = 200
+        mock_resp.iter_content.return_value = [b"%PDF-1.4", b"...more"]
+        mock_resp.headers = {"Content-Type": "application/pdf"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        # When: スクレイピングを実行
+        # Then: ValueError が発生し、接続は閉じられる
+        with pytest.raises(ValueError, match="PDF のサイズが大きすぎる"):
+            ScrapingService.scrape("http://example.com/file.pdf")
+        mock_resp.close.assert_called_once()
 
     @patch("apps.gist.services.scraping_service.socket.getaddrinfo")
     def test_validate_url_ipv6_loopback_rejected(self, mock_getaddrinfo):
@@ -170,7 +301,7 @@ class TestScrapingService:
         html_content = "<html><head><title>Test</title></head></html>"
         mock_response = MagicMock(spec=Response)
         mock_response.status_code = 200
-        mock_response.content = html_content.encode("utf-8")
+        mock_response.iter_content.return_value = [html_content.encode("utf-8")]
         mock_response.headers = {"Content-Type": "text/html"}
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
@@ -188,7 +319,7 @@ class TestScrapingService:
         mock_resp = MagicMock(spec=Response)
         mock_resp.status_code = 404
         mock_resp.headers = {"Content-Type": "text/html"}
-        mock_resp.content = b"not found"
+        mock_resp.iter_content.return_value = [b"not found"]
         mock_resp.raise_for_status.side_effect = requests.HTTPError(
             "404 Client Error: Not Found for url"
         )
@@ -207,3 +338,109 @@ class TestScrapingService:
         ]
         with pytest.raises(ValueError, match="指定のホストは許可されていません。"):
             ScrapingService.validate_url(url)
+
+    @pytest.mark.parametrize(
+        "content_type, body",
+        [
+            # Content-Type の charset を信頼する
+            (
+                "text/html; charset=Shift_JIS",
+                "<html><body><p>日本語のページ</p></body></html>".encode("cp932"),
+            ),
+            # charset がなければ <meta charset> を参照する
+            (
+                "text/html",
+                '<html><head><meta charset="EUC-JP"></head><body><p>日本語のページ</p></body></html>'.encode(
+                    "euc_jp"
+                ),
+            ),
+            # http-equiv 形式の meta
+            (
+                "text/html",
+                '<html><head><meta http-equiv="Content-Type" content="text/html; charset=shift_jis"></head>'
+                "<body><p>日本語のページ</p></body></html>".encode("cp932"),
+            ),
+            # BOM
+            (
+                "text/html",
+                "<html><body><p>日本語のページ</p></body></html>".encode("utf-16"),
+            ),
+        ],
+    )
+    @patch("apps.gist.services.scraping_service.UnicodeDammit")
+    @patch("apps.gist.services.scraping_service.requests.get")
+    def test_scrape_decodes_declared_charset(
+        self, mock_get, mock_dammit, content_type, body
+    ):
+        # Given: 文字コードが明示された非 UTF-8 の HTML
+        mock_response = MagicMock(spec=Response)
+        mock_response.status_code = 200
+        mock_response.iter_content.return_value = [body]
+        mock_response.headers = {"Content-Type": content_type}
+        mock_response.raise_for_status = MagicMock()
+        mock_get.return_value = mock_response
+
+        # When: スクレイピングを実行
+        with patch(
+            "apps.gist.services.scraping_service.socket.getaddrinfo",
+            return_value=[(socket.AF_INET, 0, 0, "", ("93.184.216.34", 0))],
+        ):
+            result = ScrapingService.scrape("http://example.com")
+
+        # Then: 文字化けせず、推測処理も使われない
+        assert result == "日本語のページ"
+        mock_dammit.assert_not_called()
+
+    def test_decode_content_unknown_charset_falls_back_to_heuristics(self):
+        # Given: 不明な charset と UTF-8 でない本文
+        body = "<p>日本語のページ</p>".encode("euc_jp") * 20
+
+        # When: デコード
+        with patch("apps.gist.services.scraping_service.UnicodeDammit") as mock_dammit:
+            mock_dammit.return_value.unicode_markup = "decoded"
+            result = ScrapingService._decode_content(
+                body, "text/html; charset=x-unknown"
+            )
+
+        # Then: 最後の手段として UnicodeDammit が使われる
+        assert result == "decoded"
+        mock_dammit.assert_called_once_with(body, is_html=True)
+
+
+def _build_pdf(pages: list[str]) -> bytes:
+    """Builds a minimal PDF with one line of Helvetica text per page."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode("ascii")
+        objects.append(
+            b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+        )
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects)
+        )
+        kids.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(kids),
+        len(kids),
+    )
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1,
+        xref,
+    )
+    return bytes(out)
@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from apps.gist.services.snapshot_store import SnapshotStore, train_dictionary
+
+BOILERPLATE = (
+    "ホーム ニュース お問い合わせ 利用規約 プライバシーポリシー "
+    "当サイトでは Cookie を使用しています 同意して閉じる "
+    "Copyright Example News All rights reserved"
+)
+
+
+def _page(i: int) -> str:
+    return f"{BOILERPLATE} 記事 {i} の本文です。今日の話題は {i * 7} 件あります。 {BOILERPLATE}"
+
+
+@pytest.fixture
+def store(tmp_path, settings):
+    settings.SNAPSHOT_SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+    settings.SNAPSHOT_DICT_MAX_RECORD_BYTES = 16384
+    return SnapshotStore(tmp_path / "snapshots")
+
+
+class TestSnapshotStore:
+    def test_put_and_get(self, store):
+        # Given: 保存したテキスト
+        text = "日本語のページ本文 " * 100
+
+        # When: 保存してキーで取り出す
+        key = store.put(text)
+
+        # Then: 内容のハッシュがキーになり、同じテキストが返る
+        assert key == SnapshotStore.compute_key(text)
+        assert store.get(key) == text
+        assert store.get("0" * 64) is None
+        assert store.get("not-a-key") is None
+
+    def test_put_is_deduplicated_and_compressed(self, store):
+        # Given: 同じテキストを 2 回保存
+        text = "repeated text " * 1000
+
+        # When
+        store.put(text)
+        store.put(text)
+
+        # Then: 1 件だけ圧縮して追記される
+        (segment,) = store.directory.glob("seg-*.dat")
+        assert segment.stat().st_size < len(text) // 10
+        assert (store.directory / "index").stat().st_size == 60
+
+    def test_put_again_extends_retention(self, store):
+        # Given: 10 日前に保存されたテキスト
+        text = "再び要約されたページ"
+        with patch(
+            "apps.gist.services.snapshot_store.time.time",
+            return_value=time.time() - 10 * 86400,
+        ):
+            key = store.put(text)
+
+        # When: 新しい結果のために同じテキストを保存してから、7 日より古いものを削除する
+        store.put(text)
+        stats = store.compact(retention_seconds=7 * 86400)
+
+        # Then: 最後に保存された時刻が保持期間の起点になる
+        assert (stats.kept, stats.dropped) == (1, 0)
+        assert store.get(key) == text
+        assert SnapshotStore(store.directory).get(key) == text
+
+    def test_other_process_sees_appended_snapshots(self, store):
+        # Given: 同じディレクトリを開いた別のインスタンス (別プロセス相当)
+        other = SnapshotStore(store.directory)
+        first = other.put("first")
+        assert store.get(first) == "first"
+
+        # When: 読み込み済みのセグメントに追記される
+        second = other.put("second")
+
+        # Then: 追記分も読める
+        assert store.get(second) == "second"
+
+    def test_segments_roll_over(self, store, settings):
+        # Given: 小さなセグメント上限
+        settings.SNAPSHOT_SEGMENT_MAX_BYTES = 100
+        texts = [os.urandom(80).hex() for _ in range(3)]
+
+        # When
+        keys = [store.put(text) for text in texts]
+
+        # Then: レコードごとに新しいセグメントが作られ、すべて読める
+        assert len(list(store.directory.glob("seg-*.dat"))) == 3
+        assert [store.get(key) for key in keys] == texts
+
+    def test_compact_drops_expired_and_trains_dictionary(self, store):
+        # Given: 古いスナップショット 1 件と、共通部分の多い小さなページ
+        with patch("apps.gist.services.snapshot_store.time.time", return_value=0):
+            expired = store.put("old page")
+        keys = [store.put(_page(i)) for i in range(30)]
+        size_before = sum(p.stat().st_size for p in store.directory.glob("seg-*"))
+
+        # When: 1 日より古いものを削除して圧縮し直す
+        stats = store.compact(retention_seconds=86400)
+
+        # Then: 期限切れだけが消え、辞書によりサイズが縮む
+        assert (stats.kept, stats.dropped) == (30, 1)
+        assert stats.dict_id == 1
+        assert stats.bytes_before == size_before
+        assert stats.bytes_after < size_before / 2
+        assert store.get(expired) is None
+        assert [store.get(key) for key in keys] == [_page(i) for i in range(30)]
+        assert [p.name for p in store.directory.glob("seg-*")] == ["seg-000002.dat"]
+
+    def test_put_is_not_blocked_while_compacting(self, store):
+        # Given: 期限切れのテキストと、辞書を学習できるだけのページ
+        with patch(
+            "apps.gist.services.snapshot_store.time.time",
+            return_value=time.time() - 10 * 86400,
+        ):
+            expired = store.put("old page")
+        keys = [store.put(_page(i)) for i in range(30)]
+        other = SnapshotStore(store.directory)
+        added = {}
+
+        def put_from_other_process(samples):
+            # セグメントの書き直し中に別プロセスが保存する
+            def put():
+                added["new"] = other.put("saved while compacting")
+                other.put("old page")
+
+            thread = threading.Thread(target=put)
+            thread.start()
+            thread.join(timeout=5)
+            assert not thread.is_alive()
+            return train_dictionary(samples)
+
+        # When
+        with patch(
+            "apps.gist.services.snapshot_store.train_dictionary",
+            side_effect=put_from_other_process,
+        ):
+            stats = store.compact(retention_seconds=7 * 86400)
+
+        # Then: 書き直し中に追記・再保存された内容も新しいアーカイブに残る
+        assert (stats.kept, stats.dropped) == (32, 1)
+        assert store.get(added["new"]) == "saved while compacting"
+        assert store.get(expired) == "old page"
+        assert [store.get(key) for key in keys] == [_page(i) for i in range(30)]
+        assert other.get(added["new"]) == "saved while compacting"
+        assert not list(store.directory.glob(".compact-*"))
+
+    def test_compact_is_picked_up_by_other_processes(self, store):
+        # Given: 別のインスタンスが古い index とセグメントを読み込み済み
+        keys = [store.put(_page(i)) for i in range(30)]
+        other = SnapshotStore(store.directory)
+        assert other.get(keys[0]) == _page(0)
+
+        # When: compact 後に辞書付きで新しいページを追記する
+        store.compact()
+        new_key = store.put(_page(100))
+
+        # Then: 別のインスタンスも新しい index と辞書で読める
+        assert other.get(keys[1]) == _page(1)
+        assert other.get(new_key) == _page(100)
+
+    def test_partial_index_entry_is_ignored(self, store):
+        # Given: 書き込み途中で止まった index の末尾
+        key = store.put("complete")
+        with open(store.directory / "index", "ab") as index:
+            index.write(b"\0" * 10)
+
+        # When: 別のインスタンスが読み込み、追記する
+        other = SnapshotStore(store.directory)
+        new_key = other.put("after crash")
+
+        # Then: 不完全なエントリは取り除かれ、前後の内容が読める
+        assert other.get(key) == "complete"
+        assert SnapshotStore(store.directory).get(new_key) == "after crash"
+
+    def test_train_dictionary_needs_enough_samples(self):
+        # Given / When / Then: サンプルが少なければ辞書は作らない
+        assert train_dictionary([b"a b c d e"] * 5) == b""
+
+        # 共通のフレーズが辞書に含まれ、上限サイズに収まる
+        samples = [_page(i).encode("utf-8") for i in range(30)]
+        zdict = train_dictionary(samples, size=1024)
+        assert BOILERPLATE.encode("utf-8") in zdict
+        assert len(zdict) <= 1024
+
+
+class TestCompactSnapshotsCommand:
+    def test_disabled(self, settings):
+        # Given: アーカイブが無効
+        settings.SNAPSHOT_ENABLED = False
+
+        # When / Then
+        with pytest.raises(CommandError):
+            call_command("compact_snapshots")
+
+    def test_compacts_default_store(self, tmp_path, settings):
+        # Given: 設定のディレクトリに保存されたスナップショット
+        settings.SNAPSHOT_ENABLED = True
+        settings.SNAPSHOT_DIR = tmp_path
+        settings.SNAPSHOT_RETENTION_DAYS = 1
+        store = SnapshotStore.default()
+        with patch(
+            "apps.gist.services.snapshot_store.time.time",
+            return_value=time.time() - 2 * 86400,
+        ):
+            store.put("old")
+        store.put("new")
+
+        # When
+        out = StringIO()
+        call_command("compact_snapshots", stdout=out)
+
+        # Then: 保持期間を過ぎたものだけが削除される
+        assert "Kept 1 snapshots, dropped 1" in out.getvalue()
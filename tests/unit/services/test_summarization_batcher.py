@@ -0,0 +1,68 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from apps.gist.services.summarization_batcher import SummarizationBatcher
+
+
+class TestSummarizationBatcher:
+    def test_single_submission_runs_handler_alone(self):
+        # Given: 待ち時間ゼロのバッチャー
+        batcher = SummarizationBatcher(window_seconds=0, max_size=4)
+        calls = []
+
+        def handler(items):
+            calls.append(items)
+            return [item.upper() for item in items]
+
+        # When: 1 件だけ投入
+        result = batcher.submit("a", handler)
+
+        # Then: ハンドラは 1 件のバッチで呼ばれる
+        assert result == "A"
+        assert calls == [["a"]]
+
+    def test_concurrent_submissions_share_one_handler_call(self):
+        # Given: 3 件で満杯になるバッチャー (待ち時間は十分長い)
+        batcher = SummarizationBatcher(window_seconds=5, max_size=3)
+        calls = []
+        lock = threading.Lock()
+
+        def handler(items):
+            with lock:
+                calls.append(list(items))
+            return [f"summary of {item}" for item in items]
+
+        # When: 3 スレッドから同時に投入
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = {
+                item: pool.submit(batcher.submit, item, handler)
+                for item in ("a", "b", "c")
+            }
+            results = {item: f.result(timeout=5) for item, f in futures.items()}
+
+        # Then: ハンドラは 1 回だけ呼ばれ、各呼び出し元に自分の結果が返る
+        assert len(calls) == 1
+        assert sorted(calls[0]) == ["a", "b", "c"]
+        assert results == {item: f"summary of {item}" for item in ("a", "b", "c")}
+
+    def test_exception_result_is_raised_to_its_caller(self):
+        # Given: 例外インスタンスを結果として返すハンドラ
+        batcher = SummarizationBatcher(window_seconds=0, max_size=4)
+
+        # When / Then: 呼び出し元に例外が送出される
+        with pytest.raises(ValueError, match="boom"):
+            batcher.submit("a", lambda items: [ValueError("boom")])
+
+    def test_handler_failure_is_raised(self):
+        # Given: 例外を送出するハンドラ
+        batcher = SummarizationBatcher(window_seconds=0, max_size=4)
+
+        def handler(items):
+            raise RuntimeError("handler failed")
+
+        # When / Then: 例外が呼び出し元に伝播し、次の投入は新しいバッチになる
+        with pytest.raises(RuntimeError, match="handler failed"):
+            batcher.submit("a", handler)
+        assert batcher.submit("b", lambda items: ["ok"]) == "ok"
@@ -1,12 +1,15 @@
-from unittest.mock import MagicMock
+import threading
+from unittest.mock import MagicMock, patch
 
 from django.core.exceptions import ImproperlyConfigured
 from django.test import TestCase, override_settings
 from requests.exceptions import RequestException
 
+from apps.gist.services.summarization_batcher import SummarizationBatcher
 from apps.gist.services.summarization_service import (
     SummarizationService,
     SummarizationServiceError,
+    _SingleCall,
 )
 
 # Define constants for reuse
@@ -78,6 +81,45 @@ class TestSummarizationService(TestCase):
         self.assertEqual(result, expected_summary)
         mock_client.generate.assert_called_once()
 
+    @override_settings(
+        SUMMARIZATION_FAST_MODEL="fast-model", SUMMARIZATION_ROUTING_SHORT_CHARS=50
+    )
+    def test_summarize_routes_to_fast_model(self):
+        """
+        Test that the router's choice is used and the call latency is recorded.
+        """
+        # Given
+        mock_client = MagicMock()
+        mock_client.generate.return_value = "summary"
+        service = SummarizationService()
+        service.llm_client = mock_client
+
+        # When
+        with patch(
+            "apps.gist.services.summarization_service.model_router.record_latency"
+        ) as mock_record:
+            service.summarize("short text")
+            service.summarize("long text " * 20, quality="high")
+
+        # Then
+        called_models = [c.kwargs["model"] for c in mock_client.generate.call_args_list]
+        self.assertEqual(called_models, ["fast-model", TEST_MODEL])
+        self.assertEqual(
+            [c.args[0] for c in mock_record.call_args_list], ["fast-model", TEST_MODEL]
+        )
+
+    def test_summarize_rejects_unknown_quality(self):
+        """
+        Test that an invalid quality tier raises ValueError without calling the API.
+        """
+        mock_client = MagicMock()
+        service = SummarizationService()
+        service.llm_client = mock_client
+
+        with self.assertRaises(ValueError):
+            service.summarize("text", quality="best")
+        mock_client.generate.assert_not_called()
+
     @override_settings(LLM_API_ENDPOINT=None)
     def test_init_raises_error_if_url_not_configured(self):
         """
@@ -109,3 +151,146 @@ class TestSummarizationService(TestCase):
         self.assertEqual(result_empty, "")
         self.assertEqual(result_whitespace, "")
         mock_client.generate.assert_not_called()
+
+
+@override_settings(
+    SUMMARIZATION_MODEL=TEST_MODEL,
+    SUMMARY_BATCH_ENABLED=True,
+    SUMMARY_BATCH_SHORT_CHARS=100,
+)
+class TestSummarizationServiceBatching(TestCase):
+    def setUp(self):
+        self.service = SummarizationService()
+        self.mock_client = MagicMock()
+        self.service.llm_client = self.mock_client
+
+    def test_short_text_is_routed_through_batcher(self):
+        """
+        Test that short texts are submitted to the shared batcher.
+        """
+        # Given
+        mock_batcher = MagicMock()
+        mock_batcher.submit.return_value = "batched summary"
+
+        # When
+        with patch.object(
+            SummarizationService, "_get_batcher", return_value=mock_batcher
+        ):
+            result = self.service.summarize("short text")
+
+        # Then
+        self.assertEqual(result, "batched summary")
+        mock_batcher.submit.assert_called_once_with(
+            "short text", self.service._summarize_batch
+        )
+        self.mock_client.generate.assert_not_called()
+
+    def test_long_text_bypasses_batcher(self):
+        """
+        Test that texts longer than SUMMARY_BATCH_SHORT_CHARS use a single call.
+        """
+        # Given
+        self.mock_client.generate.return_value = "summary"
+
+        # When
+        with patch.object(SummarizationService, "_get_batcher") as mock_get:
+            result = self.service.summarize("x" * 101)
+
+        # Then
+        self.assertEqual(result, "summary")
+        mock_get.assert_not_called()
+        self.mock_client.generate.assert_called_once()
+
+    def test_summarize_batch_parses_combined_response(self):
+        """
+        Test that one LLM call is split back into per-text summaries.
+        """
+        # Given
+        self.mock_client.generate.return_value = (
+            "=== 要約 1 ===\nタイトル: A\n\n=== 要約 2 ===\nタイトル: B\n"
+        )
+
+        # When
+        results = self.service._summarize_batch(["first text", "second text"])
+
+        # Then
+        self.assertEqual(results, ["タイトル: A", "タイトル: B"])
+        self.mock_client.generate.assert_called_once()
+        called_prompt = self.mock_client.generate.call_args.kwargs["prompt"]
+        self.assertIn("=== テキスト 1 ===\nfirst text", called_prompt)
+        self.assertIn("=== テキスト 2 ===\nsecond text", called_prompt)
+
+    def test_summarize_batch_does_not_record_latency(self):
+        """
+        Test that batched calls are kept out of the routing latency window.
+        """
+        # Given
+        self.mock_client.generate.return_value = (
+            "=== 要約 1 ===\nタイトル: A\n\n=== 要約 2 ===\nタイトル: B\n"
+        )
+
+        # When
+        with patch(
+            "apps.gist.services.summarization_service.model_router.record_latency"
+        ) as mock_record:
+            self.service._summarize_batch(["first text", "second text"])
+
+        # Then
+        mock_record.assert_not_called()
+
+    def test_summarize_batch_falls_back_on_unparsable_response(self):
+        """
+        Test that a response missing a section tells every caller to retry alone.
+        """
+        # Given
+        self.mock_client.generate.return_value = "=== 要約 1 ===\nタイトル: A\n"
+
+        # When
+        results = self.service._summarize_batch(["first text", "second text"])
+
+        # Then
+        self.assertEqual(results, [_SingleCall(TEST_MODEL)] * 2)
+        self.mock_client.generate.assert_called_once()
+
+    def test_fallback_calls_run_in_each_callers_thread(self):
+        """
+        Test that after a failed batch each caller makes its own call concurrently,
+        and a failing text does not fail the others.
+        """
+        # Given: 2 件揃うまで待つバッチャと、結合リクエストだけが失敗する LLM
+        single_call_threads = []
+
+        def generate(prompt, model):
+            if "=== テキスト" in prompt:
+                raise RequestException("batch error")
+            single_call_threads.append(threading.current_thread().name)
+            if "second text" in prompt:
+                raise RequestException("single error")
+            return "single A"
+
+        self.mock_client.generate.side_effect = generate
+        batcher = SummarizationBatcher(window_seconds=5, max_size=2)
+        results = {}
+
+        def call(text):
+            try:
+                results[text] = self.service.summarize(text)
+            except SummarizationServiceError as e:
+                results[text] = e
+
+        threads = [
+            threading.Thread(target=call, args=(text,), name=text)
+            for text in ("first text", "second text")
+        ]
+
+        # When
+        with patch.object(SummarizationService, "_get_batcher", return_value=batcher):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=5)
+
+        # Then
+        self.assertEqual(results["first text"], "single A")
+        self.assertIsInstance(results["second text"], SummarizationServiceError)
+        self.assertCountEqual(single_call_threads, ["first text", "second text"])
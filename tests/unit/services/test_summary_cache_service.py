@@ -0,0 +1,167 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.gist.services.summary_cache_service import SummaryCacheService
+
+URL = "https://example.com"
+TIME_PATH = "apps.gist.services.summary_cache_service.time.time"
+
+
+@override_settings(
+    SUMMARY_CACHE_TTL=100,
+    SUMMARY_CACHE_STALE_SECONDS=50,
+    SUMMARY_CACHE_REFRESH_AHEAD_SECONDS=20,
+    SUMMARY_CACHE_HOT_HITS=2,
+    SUMMARY_CACHE_REFRESH_WORKERS=1,
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "summaries": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "test-summary-cache",
+        },
+    },
+)
+class TestSummaryCacheService(SimpleTestCase):
+    def setUp(self):
+        caches["summaries"].clear()
+        self.loader = MagicMock(return_value=("page text", "summary v1"))
+        patcher = patch.object(SummaryCacheService, "_schedule_refresh")
+        self.mock_schedule = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @override_settings(SUMMARY_CACHE_TTL=0)
+    def test_disabled_cache_always_loads(self):
+        """
+        Test that a TTL of 0 bypasses the cache.
+        """
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_miss_then_hit(self):
+        """
+        Test that a loaded summary is served from the cache afterwards.
+        """
+        first = SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        second = SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.assertEqual(first.summary, "summary v1")
+        self.assertEqual(second.summary, "summary v1")
+        self.assertFalse(second.stale)
+        self.loader.assert_called_once()
+        self.mock_schedule.assert_not_called()
+
+    def test_quality_tiers_are_cached_separately(self):
+        """
+        Test that the quality tier is part of the cache key.
+        """
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        SummaryCacheService.get_or_load(URL, "high", self.loader)
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_empty_summary_is_not_cached(self):
+        """
+        Test that empty summaries are never stored.
+        """
+        self.loader.return_value = ("", "")
+
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_hot_entry_is_refreshed_ahead_of_expiry(self):
+        """
+        Test that a frequently hit entry near expiry triggers a background refresh.
+        """
+        with patch(TIME_PATH, return_value=1000.0):
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        # 期限 (1100) の 20 秒前より前はまだ更新しない
+        with patch(TIME_PATH, return_value=1050.0):
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        self.mock_schedule.assert_not_called()
+
+        with patch(TIME_PATH, return_value=1085.0):
+            result = SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.assertFalse(result.stale)
+        self.mock_schedule.assert_called_once()
+        self.loader.assert_called_once()
+
+    def test_cold_entry_near_expiry_is_not_refreshed(self):
+        """
+        Test that an entry with a single hit is left to expire.
+        """
+        with patch(TIME_PATH, return_value=1000.0):
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        with patch(TIME_PATH, return_value=1090.0):
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.mock_schedule.assert_not_called()
+
+    def test_expired_entry_is_served_stale_while_revalidating(self):
+        """
+        Test that an entry past its TTL is returned as stale and refreshed.
+        """
+        with patch(TIME_PATH, return_value=1000.0):
+            SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        with patch(TIME_PATH, return_value=1110.0):
+            result = SummaryCacheService.get_or_load(URL, "auto", self.loader)
+
+        self.assertTrue(result.stale)
+        self.assertEqual(result.summary, "summary v1")
+        self.mock_schedule.assert_called_once()
+        self.loader.assert_called_once()
+
+    def test_refresh_replaces_entry(self):
+        """
+        Test that a background refresh stores the new summary and releases its flag.
+        """
+        SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        key = SummaryCacheService._cache_key(URL, "auto")
+        caches["summaries"].add(f"{key}:refreshing", 1)
+        self.loader.return_value = ("page text", "summary v2")
+
+        SummaryCacheService._refresh(key, self.loader)
+
+        result = SummaryCacheService.get_or_load(URL, "auto", self.loader)
+        self.assertEqual(result.summary, "summary v2")
+        self.assertIsNone(caches["summaries"].get(f"{key}:refreshing"))
+
+    def test_concurrent_misses_share_one_load(self):
+        """
+        Test that simultaneous misses for one URL call the loader once.
+        """
+        release = threading.Event()
+        calls = []
+
+        def slow_loader():
+            calls.append(1)
+            release.wait(5)
+            return ("page text", "summary")
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(
+                    SummaryCacheService.get_or_load(URL, "auto", slow_loader)
+                )
+            )
+            for _ in range(3)
+        ]
+        for thread in threads:
+            thread.start()
+        # 全スレッドが待ち状態に入るまで少し待つ
+        threading.Event().wait(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r.summary for r in results], ["summary"] * 3)
@@ -0,0 +1,117 @@
+import json
+import os
+
+import pytest
+
+from apps.gist.services.worker_metrics import (
+    RETIRED_PID,
+    WorkerMetrics,
+    WorkerState,
+    render_prometheus,
+)
+
+DEAD_PID = 2**22 + 1
+
+
+@pytest.fixture
+def metrics_dir(tmp_path, settings, monkeypatch):
+    settings.METRICS_DIR = tmp_path
+    monkeypatch.setattr(WorkerMetrics, "_flushed_pid", None)
+    return tmp_path
+
+
+def _write(path, decisions):
+    path.write_text(json.dumps({"decisions": decisions, "latency_p90": {"m": 1.5}}))
+
+
+class TestWorkerMetrics:
+    def test_collect_includes_other_workers(self, metrics_dir):
+        # Given: 稼働中の別ワーカー (親プロセス) が書き出したファイルと不正なファイル
+        _write(metrics_dir / f"{os.getppid()}.json", [["m", "default", 3]])
+        (metrics_dir / "broken.json").write_text("{")
+
+        # When
+        workers = WorkerMetrics.collect()
+
+        # Then: 自プロセスの状態も書き出され、不正なファイルは無視される
+        by_pid = {worker.pid: worker for worker in workers}
+        assert set(by_pid) == {os.getpid(), os.getppid(), RETIRED_PID}
+        assert by_pid[os.getpid()].alive
+        assert by_pid[os.getppid()].alive
+        assert by_pid[os.getppid()].state["decisions"] == [["m", "default", 3]]
+        assert not by_pid[RETIRED_PID].alive
+        assert by_pid[RETIRED_PID].state == {}
+
+    def test_collect_retires_exited_workers(self, metrics_dir):
+        # Given: 入れ替えで終了したワーカーのファイルが 2 回に分けて現れる
+        _write(metrics_dir / f"{DEAD_PID}.json", [["m", "default", 3]])
+        WorkerMetrics.collect()
+        _write(metrics_dir / f"{DEAD_PID + 1}.json", [["m", "default", 4]])
+
+        # When
+        workers = WorkerMetrics.collect()
+
+        # Then: カウンタは 1 つの合計に畳み込まれ、ファイルは削除される
+        by_pid = {worker.pid: worker for worker in workers}
+        assert set(by_pid) == {os.getpid(), RETIRED_PID}
+        assert by_pid[RETIRED_PID].state == {"decisions": [["m", "default", 7]]}
+        assert not (metrics_dir / f"{DEAD_PID}.json").exists()
+        assert not (metrics_dir / f"{DEAD_PID + 1}.json").exists()
+
+    def test_flush_retires_file_of_reused_pid(self, metrics_dir):
+        # Given: 同じ pid で以前に動いていたプロセスが残したファイル
+        _write(metrics_dir / f"{os.getpid()}.json", [["m", "default", 5]])
+
+        # When
+        workers = WorkerMetrics.collect()
+
+        # Then: 上書きされる前に退避され、合計は減らない
+        by_pid = {worker.pid: worker for worker in workers}
+        assert by_pid[RETIRED_PID].state == {"decisions": [["m", "default", 5]]}
+
+    def test_clear(self, metrics_dir):
+        # Given
+        _write(metrics_dir / f"{DEAD_PID}.json", [["m", "default", 3]])
+        WorkerMetrics.collect()
+
+        # When
+        WorkerMetrics.clear()
+
+        # Then
+        assert list(metrics_dir.glob("*.json")) == []
+
+
+def test_render_prometheus_aggregates_workers():
+    # Given: 稼働中のワーカー 2 つと、入れ替えで終了したワーカー 1 つ
+    workers = [
+        WorkerState(
+            1,
+            True,
+            {"decisions": [["fast", "short_input", 2]], "latency_p90": {"fast": 0.5}},
+        ),
+        WorkerState(
+            2,
+            True,
+            {"decisions": [["fast", "short_input", 3]], "latency_p90": {"fast": None}},
+        ),
+        WorkerState(
+            3,
+            False,
+            {"decisions": [["fast", "short_input", 4]], "latency_p90": {"fast": 9.0}},
+        ),
+    ]
+
+    # When
+    metrics = render_prometheus(workers)
+
+    # Then: カウンタは全ワーカーの合計、p90 は稼働中のワーカーごと
+    assert (
+        'gist_summarization_routing_decisions_total{model="fast",reason="short_input"} 9\n'
+        in metrics
+    )
+    assert (
+        'gist_summarization_latency_p90_seconds{model="fast",pid="1"} 0.500\n'
+        in metrics
+    )
+    assert 'pid="2"' not in metrics
+    assert 'pid="3"' not in metrics
@@ -0,0 +1,263 @@
+import json
+import tempfile
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+
+from apps.gist.services import ResultService, SummarizationServiceError
+
+SCRAPE_PATH = "apps.gist.views.ScrapingService.scrape"
+SERVICE_PATH = "apps.gist.views.SummarizationService"
+
+
+class TestSummarizeApi(TestCase):
+    url = "/api/summarize/"
+
+    @patch(SERVICE_PATH)
+    @patch(SCRAPE_PATH, return_value="本文" * 1000)
+    def test_returns_summary_without_content(self, mock_scrape, mock_service):
+        """
+        Test that the API omits the scraped text by default.
+        """
+        # Given
+        mock_service.return_value.summarize.return_value = "要約"
+
+        # When
+        response = self.client.post(self.url, {"url": "https://example.com"})
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        key = ResultService.compute_key("https://example.com", "本文" * 1000, "要約")
+        self.assertEqual(
+            response.json(),
+            {
+                "url": "https://example.com",
+                "summary": "要約",
+                "content_length": 2000,
+                "permalink": f"http://testserver/results/{key}/",
+            },
+        )
+        # ensure_ascii=False で日本語がそのまま出力される
+        self.assertIn("要約".encode(), response.content)
+        mock_scrape.assert_called_once_with("https://example.com")
+
+    @patch(SERVICE_PATH)
+    @patch(SCRAPE_PATH, return_value="page text")
+    def test_include_content_with_json_body(self, mock_scrape, mock_service):
+        """
+        Test that the full text is returned when include_content is requested.
+        """
+        mock_service.return_value.summarize.return_value = "summary"
+
+        response = self.client.post(
+            self.url,
+            data=json.dumps({"url": "https://example.com", "include_content": True}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["content"], "page text")
+
+    @patch(SERVICE_PATH)
+    @patch(SCRAPE_PATH, return_value="page text")
+    def test_quality_is_passed_to_summarizer(self, mock_scrape, mock_service):
+        """
+        Test that the requested quality tier reaches the summarization service.
+        """
+        mock_service.return_value.summarize.return_value = "summary"
+
+        self.client.post(self.url, {"url": "https://example.com", "quality": "fast"})
+
+        mock_service.return_value.summarize.assert_called_once_with(
+            "page text", quality="fast"
+        )
+
+    def test_missing_url(self):
+        """
+        Test that a request without a URL is rejected with 400.
+        """
+        response = self.client.post(self.url, {})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.json())
+
+    def test_invalid_json(self):
+        """
+        Test that a malformed JSON body is rejected with 400.
+        """
+        response = self.client.post(
+            self.url, data="{not json", content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_not_allowed(self):
+        """
+        Test that only POST is accepted.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 405)
+
+    @patch(SCRAPE_PATH, side_effect=ValueError("URLのホスト名が不正です。"))
+    def test_scraping_error_maps_to_400(self, mock_scrape):
+        """
+        Test that input errors are returned as 400 with their message.
+        """
+        response = self.client.post(self.url, {"url": "http://"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"error": "URLのホスト名が不正です。"})
+
+    @patch(SERVICE_PATH)
+    @patch(SCRAPE_PATH, return_value="page text")
+    def test_summarization_error_maps_to_503(self, mock_scrape, mock_service):
+        """
+        Test that summarization service failures are returned as 503.
+        """
+        mock_service.return_value.summarize.side_effect = SummarizationServiceError(
+            "down"
+        )
+
+        response = self.client.post(self.url, {"url": "https://example.com"})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(list(response.json()), ["error"])
+
+    @patch(SERVICE_PATH)
+    @patch(SCRAPE_PATH, return_value="page text " * 100)
+    def test_response_is_gzip_compressed(self, mock_scrape, mock_service):
+        """
+        Test that responses are compressed for clients that accept gzip.
+        """
+        mock_service.return_value.summarize.return_value = "summary " * 50
+
+        response = self.client.post(
+            self.url,
+            {"url": "https://example.com"},
+            HTTP_ACCEPT_ENCODING="gzip",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+
+class TestResultPermalinks(TestCase):
+    def setUp(self):
+        self.result = ResultService.save(
+            "https://example.com", "page text", "要約テキスト"
+        )
+        self.page_url = f"/results/{self.result.key}/"
+        self.api_url = f"/api/results/{self.result.key}/"
+
+    def test_result_page_has_cache_headers(self):
+        """
+        Test that a permalink is served with a weak ETag and public caching.
+        """
+        response = self.client.get(self.page_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "要約テキスト")
+        self.assertEqual(response["ETag"], f'W/"{self.result.key}"')
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertNotIn("Set-Cookie", response.headers)
+
+    def test_matching_etag_returns_304_without_loading_result(self):
+        """
+        Test that If-None-Match short-circuits to 304 carrying the ETag.
+        """
+        with patch("apps.gist.views.ResultService.get") as mock_get:
+            response = self.client.get(
+                self.page_url, HTTP_IF_NONE_MATCH=f'"{self.result.key}"'
+            )
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], f'W/"{self.result.key}"')
+        self.assertIn("max-age", response["Cache-Control"])
+        mock_get.assert_not_called()
+
+    def test_etag_is_unchanged_by_gzip(self):
+        """
+        Test that gzip clients get the same ETag and can revalidate with it.
+        """
+        response = self.client.get(self.page_url, HTTP_ACCEPT_ENCODING="gzip")
+        revalidated = self.client.get(
+            self.page_url,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], f'W/"{self.result.key}"')
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+
+    def test_etag_of_unknown_key_returns_404(self):
+        """
+        Test that If-None-Match does not produce a 304 for a key that is not stored.
+        """
+        key = "0" * 32
+
+        response = self.client.get(f"/results/{key}/", HTTP_IF_NONE_MATCH=f'"{key}"')
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_unknown_key_returns_404(self):
+        """
+        Test that a well-formed but unknown key is a 404.
+        """
+        response = self.client.get(f"/results/{'0' * 32}/")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_post_not_allowed(self):
+        """
+        Test that permalinks only accept safe methods.
+        """
+        response = self.client.post(self.page_url)
+
+        self.assertEqual(response.status_code, 405)
+
+    def test_result_api(self):
+        """
+        Test the JSON permalink with and without the scraped content.
+        """
+        response = self.client.get(self.api_url)
+        with_content = self.client.get(self.api_url, {"include_content": "1"})
+
+        self.assertEqual(
+            response.json(),
+            {
+                "url": "https://example.com",
+                "summary": "要約テキスト",
+                "content_length": 9,
+            },
+        )
+        self.assertEqual(with_content.json()["content"], "page text")
+        self.assertEqual(response["ETag"], f'W/"{self.result.key}"')
+
+
+class TestMetrics(TestCase):
+    def test_metrics_endpoint(self):
+        """
+        Test that routing metrics are served in Prometheus text format.
+        """
+        with tempfile.TemporaryDirectory() as tmp, override_settings(METRICS_DIR=tmp):
+            response = self.client.get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(
+            b"# TYPE gist_summarization_routing_decisions_total counter",
+            response.content,
+        )
+
+    def test_metrics_endpoint_accepts_compose_host(self):
+        """
+        Test that Prometheus can scrape web:8000/metrics inside the Compose network.
+        """
+        with tempfile.TemporaryDirectory() as tmp, override_settings(METRICS_DIR=tmp):
+            response = self.client.get("/metrics", HTTP_HOST="web:8000")
+
+        self.assertEqual(response.status_code, 200)